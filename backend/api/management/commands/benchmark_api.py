@@ -0,0 +1,252 @@
+"""Бенчмарк эндпоинтов API."""
+
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import ShoppingListItem, Subscribe, User
+
+BASELINE = settings.BASE_DIR / 'api' / 'benchmarks' / 'baseline.json'
+ROUTES = (
+    ('tags-list', 'get', '/api/v1/tags/'),
+    ('tags-detail', 'get', '/api/v1/tags/{tag}/'),
+    ('ingredients-list', 'get', '/api/v1/ingredients/'),
+    ('ingredients-search', 'get', '/api/v1/ingredients/?name=мук'),
+    ('ingredients-detail', 'get', '/api/v1/ingredients/{ingredient}/'),
+    ('recipes-list', 'get', '/api/v1/recipes/'),
+    ('recipes-list-deep', 'get', '/api/v1/recipes/?page={last_page}'),
+    (
+        'recipes-list-tags',
+        'get',
+        '/api/v1/recipes/?tags=breakfast&tags=lunch'
+    ),
+    ('recipes-list-author', 'get', '/api/v1/recipes/?author={author}'),
+    ('recipes-list-favorited', 'get', '/api/v1/recipes/?is_favorited=1'),
+    (
+        'recipes-list-in-cart',
+        'get',
+        '/api/v1/recipes/?is_in_shopping_cart=1'
+    ),
+    ('recipes-detail', 'get', '/api/v1/recipes/{recipe}/'),
+    ('recipes-favorite-add', 'post', '/api/v1/recipes/{recipe}/favorite/'),
+    (
+        'recipes-favorite-remove',
+        'delete',
+        '/api/v1/recipes/{recipe}/favorite/'
+    ),
+    (
+        'shopping-cart-add',
+        'post',
+        '/api/v1/recipes/{recipe}/shopping_cart/'
+    ),
+    (
+        'shopping-cart-remove',
+        'delete',
+        '/api/v1/recipes/{recipe}/shopping_cart/'
+    ),
+    (
+        'shopping-cart-download',
+        'get',
+        '/api/v1/recipes/download_shopping_cart/'
+    ),
+    ('users-list', 'get', '/api/v1/users/'),
+    ('users-detail', 'get', '/api/v1/users/{author}/'),
+    ('users-me', 'get', '/api/v1/users/me/'),
+    ('users-subscriptions', 'get', '/api/v1/users/subscriptions/'),
+    ('users-subscribe', 'post', '/api/v1/users/{unsubscribed}/subscribe/'),
+    (
+        'users-unsubscribe',
+        'delete',
+        '/api/v1/users/{unsubscribed}/subscribe/'
+    ),
+)
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[int(index)]
+
+
+class Command(BaseCommand):
+    """Замер количества запросов, задержек и размера ответов."""
+
+    help = (
+        'Замеряет число SQL запросов, p50/p99 задержки и размер ответа '
+        'для эндпоинтов API и сравнивает число запросов с базовой линией.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--report', help='Файл для JSON отчёта, по умолчанию stdout.'
+        )
+        parser.add_argument('--baseline', default=str(BASELINE))
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать текущее число запросов как базовую линию.'
+        )
+        parser.add_argument(
+            '--tolerance', type=int, default=0,
+            help='Допустимое превышение числа запросов над базовой линией.'
+        )
+        parser.add_argument(
+            '--route', action='append', dest='routes',
+            help='Замерить только указанные маршруты.'
+        )
+
+    def handle(self, *args, **options):
+        """Запуск бенчмарка."""
+        user = (
+            User.objects.filter(shopping_cart__isnull=False)
+            .order_by('pk').first()
+        )
+        if user is None:
+            raise CommandError(
+                'Нет данных для бенчмарка, запустите seed_benchmark_data.'
+            )
+        token, _ = Token.objects.get_or_create(user=user)
+        client = APIClient(raise_request_exception=False)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        params = self.route_params(user)
+        results = {}
+        for name, method, path in ROUTES:
+            if options['routes'] and name not in options['routes']:
+                continue
+            results[name] = self.measure(
+                client, method, path.format(**params), options['repeat']
+            )
+        report = json.dumps(
+            {'vendor': connection.vendor, 'routes': results},
+            ensure_ascii=False,
+            indent=2,
+        )
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
+        if options['save_baseline']:
+            self.save_baseline(options['baseline'], results)
+            return
+        self.check_baseline(
+            options['baseline'], results, options['tolerance']
+        )
+
+    def route_params(self, user):
+        """Идентификаторы объектов для подстановки в маршруты.
+
+        Рецепта для добавления в избранное и список покупок нет ни в
+        избранном, ни в списке покупок пользователя, и ни один из его
+        ингредиентов не входит в список покупок. Поэтому число запросов
+        не зависит от того, какие рецепты попали в список при наполнении.
+        """
+        recipe = Recipe.objects.exclude(author=user).exclude(
+            favorites__user=user
+        ).exclude(
+            in_shopping_cart__user=user
+        ).exclude(
+            ingredients__ingredient__in=ShoppingListItem.objects.filter(
+                user=user
+            ).values('ingredient')
+        ).order_by('pk').first()
+        if recipe is None:
+            raise CommandError(
+                'Нет рецепта без ингредиентов из списка покупок, '
+                'запустите seed_benchmark_data.'
+            )
+        subscribed = Subscribe.objects.filter(user=user).values('author')
+        unsubscribed = (
+            User.objects.exclude(pk=user.pk).exclude(pk__in=subscribed)
+            .order_by('pk').first()
+        )
+        return {
+            'tag': Tag.objects.order_by('pk').first().pk,
+            'ingredient': Ingredient.objects.order_by('pk').first().pk,
+            'recipe': recipe.pk,
+            'author': recipe.author_id,
+            'unsubscribed': unsubscribed.pk,
+            'last_page': max(1, Recipe.objects.count() // 10),
+        }
+
+    def request(self, client, method, path):
+        """Запрос с замером числа запросов к БД, времени и размера."""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(path)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = time.perf_counter() - started
+        return response.status_code, len(queries), elapsed, size
+
+    def request_once(self, client, method, path):
+        """Замер запроса с восстановлением исходного состояния."""
+        if method == 'delete':
+            client.post(path)
+        try:
+            return self.request(client, method, path)
+        finally:
+            if method == 'post':
+                client.delete(path)
+
+    def measure(self, client, method, path, repeat):
+        """Многократный замер одного маршрута."""
+        # Прогрев: первый запрос заполняет кеши и пул соединений.
+        self.request_once(client, method, path)
+        timings, statuses, queries, size = [], set(), 0, 0
+        for _ in range(repeat):
+            status, count, elapsed, size = self.request_once(
+                client, method, path
+            )
+            timings.append(elapsed * 1000)
+            statuses.add(status)
+            queries = max(queries, count)
+        return {
+            'path': path,
+            'method': method.upper(),
+            'status': sorted(statuses),
+            'queries': queries,
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'bytes': size,
+        }
+
+    def save_baseline(self, path, results):
+        """Сохранение базовой линии числа запросов."""
+        baseline = {
+            name: result['queries'] for name, result in results.items()
+        }
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write('\n')
+        self.stderr.write(f'Базовая линия сохранена в {path}')
+
+    def check_baseline(self, path, results, tolerance):
+        """Сравнение числа запросов с базовой линией."""
+        try:
+            with open(path, encoding='utf-8') as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            raise CommandError(f'Базовая линия {path} не найдена.')
+        regressions = [
+            f'{name}: {result["queries"]} запросов '
+            f'(базовая линия {baseline[name]})'
+            for name, result in results.items()
+            if name in baseline
+            and result['queries'] > baseline[name] + tolerance
+        ]
+        if regressions:
+            raise CommandError(
+                'Регрессия числа запросов:\n' + '\n'.join(regressions)
+            )
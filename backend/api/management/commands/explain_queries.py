@@ -0,0 +1,107 @@
+"""Проверка планов запросов горячих путей API."""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from recipes.models import Favorite, Recipe, Tag
+from users.models import ShoppingCart, Subscribe, User
+
+SEQ_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*\bINDEX\b)'),
+}
+
+
+def hot_paths(user, author, recipe, tag):
+    """Запросы, которые выполняются фильтрами и флагами API."""
+    return (
+        ('recipes-by-author', Recipe.objects.filter(author=author)[:10]),
+        ('recipes-by-tag', Recipe.objects.filter(tags__slug=tag.slug)[:10]),
+        ('tag-by-slug', Tag.objects.filter(slug=tag.slug)),
+        ('recipes-popular', Recipe.objects.order_by(
+            '-favorites_count', '-pk'
+        )[:10]),
+        ('favorite-exists', Favorite.objects.filter(
+            recipe=recipe, user=user
+        )),
+        ('recipe-favorited-by', Favorite.objects.filter(
+            recipe=recipe
+        ).values('user')),
+        ('recipes-favorited', Recipe.objects.filter(
+            favorites__user=user
+        )[:10]),
+        ('in-cart-exists', ShoppingCart.objects.filter(
+            recipe=recipe, user=user
+        )),
+        ('recipe-in-carts', ShoppingCart.objects.filter(
+            recipe=recipe
+        ).values('user')),
+        ('recipes-in-cart', Recipe.objects.filter(
+            in_shopping_cart__user=user
+        )[:10]),
+        ('subscribe-exists', Subscribe.objects.filter(
+            author=author, user=user
+        )),
+        ('author-subscribers', Subscribe.objects.filter(
+            author=author
+        ).values('user')),
+        ('subscriptions', User.objects.filter(subscribing__user=user)[:10]),
+    )
+
+
+class Command(BaseCommand):
+    """Поиск последовательных сканирований в планах запросов."""
+
+    help = (
+        'Выполняет EXPLAIN для запросов фильтров и флагов API и сообщает '
+        'о последовательном сканировании таблиц. Запускайте на базе, '
+        'наполненной seed_benchmark_data.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--plans', action='store_true', help='Вывести планы запросов.'
+        )
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Завершиться с ошибкой при найденном сканировании.'
+        )
+
+    def handle(self, *args, **options):
+        """Проверка планов."""
+        pattern = SEQ_SCAN.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(
+                f'База данных {connection.vendor} не поддерживается.'
+            )
+        recipe = Recipe.objects.filter(
+            author__isnull=False, tags__isnull=False
+        ).first()
+        user = User.objects.filter(subscriber__isnull=False).first()
+        if recipe is None or user is None:
+            raise CommandError(
+                'Нет данных для проверки, запустите seed_benchmark_data.'
+            )
+        found = []
+        for name, queryset in hot_paths(
+            user, recipe.author, recipe, recipe.tags.first()
+        ):
+            plan = queryset.explain()
+            tables = sorted(set(pattern.findall(plan)))
+            if tables:
+                found.append(name)
+                self.stdout.write(self.style.WARNING(
+                    f'{name}: последовательное сканирование '
+                    f'{", ".join(tables)}'
+                ))
+            else:
+                self.stdout.write(f'{name}: OK')
+            if options['plans']:
+                self.stdout.write(plan)
+        if options['strict'] and found:
+            raise CommandError(
+                f'Последовательное сканирование: {", ".join(found)}'
+            )
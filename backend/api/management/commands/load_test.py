@@ -0,0 +1,138 @@
+"""Нагрузочный тест запущенного сервера API."""
+
+import json
+import socket
+import threading
+import time
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+from .benchmark_api import percentile
+
+# Тело, которое медленные клиенты передают по частям и не дописывают.
+SLOW_BODY_SIZE = 1024 * 1024
+SLOW_CHUNK = b' ' * 1024
+
+
+class Command(BaseCommand):
+    """Замер задержек под нагрузкой с медленными клиентами.
+
+    Быстрые клиенты в цикле запрашивают эндпоинт и замеряют задержку,
+    а медленные держат соединения, передавая тело запроса по килобайту.
+    Запустите команду против WSGI и ASGI сервера и сравните отчёты.
+    """
+
+    help = (
+        'Нагружает запущенный сервер запросами к эндпоинту и медленными '
+        'загрузками и выводит число запросов в секунду и p50/p99 задержки.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--path', default='/api/v1/recipes/')
+        parser.add_argument(
+            '--token', help='Токен для заголовка Authorization.'
+        )
+        parser.add_argument('--clients', type=int, default=10)
+        parser.add_argument(
+            '--slow-clients', type=int, default=0,
+            help='Число клиентов, медленно загружающих тело запроса.'
+        )
+        parser.add_argument(
+            '--slow-path', default='/api/v1/auth/token/login/',
+            help='Эндпоинт для медленных загрузок.'
+        )
+        parser.add_argument(
+            '--trickle-delay', type=float, default=0.5,
+            help='Пауза медленного клиента между килобайтами, в секундах.'
+        )
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument(
+            '--report', help='Файл для JSON отчёта, по умолчанию stdout.'
+        )
+
+    def handle(self, *args, **options):
+        """Запуск клиентов и сбор результатов."""
+        url = urlsplit(options['url'])
+        self.host, self.port = url.hostname, url.port or 80
+        self.headers = {'Accept': 'application/json'}
+        if options['token']:
+            self.headers['Authorization'] = f'Token {options["token"]}'
+        self.deadline = time.monotonic() + options['duration']
+        self.lock = threading.Lock()
+        self.timings, self.errors = [], 0
+        threads = [
+            threading.Thread(target=self.client, args=(options['path'],))
+            for _ in range(options['clients'])
+        ] + [
+            threading.Thread(
+                target=self.slow_client,
+                args=(options['slow_path'], options['trickle_delay']),
+            )
+            for _ in range(options['slow_clients'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.write_report(options)
+
+    def client(self, path):
+        """Последовательные запросы с замером задержки."""
+        while time.monotonic() < self.deadline:
+            started = time.perf_counter()
+            try:
+                connection = HTTPConnection(self.host, self.port, timeout=60)
+                connection.request('GET', path, headers=self.headers)
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                failed = response.status >= 500
+            except OSError:
+                failed = True
+            elapsed = (time.perf_counter() - started) * 1000
+            with self.lock:
+                self.timings.append(elapsed)
+                self.errors += failed
+
+    def slow_client(self, path, delay):
+        """Соединение, по которому тело запроса передаётся медленно."""
+        head = (
+            f'POST {path} HTTP/1.1\r\n'
+            f'Host: {self.host}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {SLOW_BODY_SIZE}\r\n\r\n'
+        ).encode()
+        while time.monotonic() < self.deadline:
+            try:
+                with socket.create_connection(
+                    (self.host, self.port), timeout=60
+                ) as connection:
+                    connection.sendall(head)
+                    while time.monotonic() < self.deadline:
+                        connection.sendall(SLOW_CHUNK)
+                        time.sleep(delay)
+            except OSError:
+                time.sleep(delay)
+
+    def write_report(self, options):
+        """Отчёт о пропускной способности и задержках."""
+        timings = self.timings or [0]
+        report = json.dumps({
+            'url': options['url'] + options['path'],
+            'clients': options['clients'],
+            'slow_clients': options['slow_clients'],
+            'requests': len(self.timings),
+            'errors': self.errors,
+            'rps': round(len(self.timings) / options['duration'], 1),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+        }, ensure_ascii=False, indent=2)
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,216 @@
+"""Наполнение базы данными для бенчмарков."""
+
+import csv
+import random
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.models import CountOfIngredient, Favorite, Ingredient, Recipe, Tag
+from users.models import ShoppingCart, ShoppingListItem, Subscribe, User
+
+SCALES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+EMAIL_TEMPLATE = 'bench{}@foodgram.local'
+EMAIL_SUFFIX = '@foodgram.local'
+TAGS = (
+    ('Завтрак', '#E26C2D', 'breakfast'),
+    ('Обед', '#49B64E', 'lunch'),
+    ('Ужин', '#8775D2', 'dinner'),
+)
+AMOUNTS = (1, 2, 3, 5, 10, 50, 100, 150, 200, 250, 300, 500, 1000)
+
+
+class Command(BaseCommand):
+    """Генерация пользователей, рецептов, избранного и подписок."""
+
+    help = 'Наполняет базу реалистичными данными для бенчмарков API.'
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--scale', choices=SCALES, default='1k',
+            help='Количество рецептов: 1k, 100k или 1m.'
+        )
+        parser.add_argument(
+            '--ingredients',
+            default=settings.BASE_DIR.parent / 'data' / 'ingredients.csv',
+            help='CSV файл с ингредиентами.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Удалить ранее сгенерированных пользователей и их рецепты.'
+        )
+
+    def handle(self, *args, **options):
+        """Генерация данных."""
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        if options['clear']:
+            self.clear()
+        if User.objects.filter(email__endswith=EMAIL_SUFFIX).exists():
+            raise CommandError(
+                'Данные для бенчмарков уже сгенерированы, используйте --clear.'
+            )
+        recipes_count = SCALES[options['scale']]
+        users_count = max(10, recipes_count // 10)
+        self.load_ingredients(options['ingredients'])
+        tags = self.create_tags()
+        amounts = self.create_amounts()
+        users = self.create_users(users_count)
+        recipes = self.create_recipes(recipes_count, users, tags, amounts)
+        self.create_relations(users, recipes)
+        call_command('reconcile_counters', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {users_count}, рецептов: {recipes_count}'
+        ))
+
+    def clear(self):
+        """Удаление сгенерированных данных."""
+        users = User.objects.filter(email__endswith=EMAIL_SUFFIX)
+        Recipe.objects.filter(author__in=users).delete()
+        users.delete()
+
+    def bulk_create(self, model, objs):
+        """Пакетная вставка с возвратом первичных ключей."""
+        created = []
+        for start in range(0, len(objs), self.batch_size):
+            batch = objs[start:start + self.batch_size]
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+                if batch and batch[0].pk is None:
+                    pks = model.objects.order_by('-pk').values_list(
+                        'pk', flat=True
+                    )[:len(batch)]
+                    for obj, pk in zip(batch, sorted(pks)):
+                        obj.pk = pk
+            created.extend(obj.pk for obj in batch)
+        return created
+
+    def bulk_link(self, through, rows):
+        """Пакетная вставка строк промежуточной таблицы."""
+        through.objects.bulk_create(
+            (through(**row) for row in rows),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+    def load_ingredients(self, path):
+        """Загрузка ингредиентов, если справочник пуст."""
+        if Ingredient.objects.exists():
+            return
+        with open(path, encoding='utf-8') as file:
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(name=name, measurement_unit=unit)
+                    for name, unit in csv.reader(file)
+                ),
+                batch_size=self.batch_size,
+            )
+
+    def create_tags(self):
+        """Создание тегов."""
+        return [
+            Tag.objects.get_or_create(
+                slug=slug, defaults={'name': name, 'color': color}
+            )[0].pk
+            for name, color, slug in TAGS
+        ]
+
+    def create_amounts(self):
+        """Создание количеств ингредиентов."""
+        ingredients = list(Ingredient.objects.values_list('pk', flat=True))
+        CountOfIngredient.objects.bulk_create(
+            (
+                CountOfIngredient(ingredient_id=ingredient, amount=amount)
+                for ingredient in ingredients
+                for amount in AMOUNTS
+            ),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        return list(CountOfIngredient.objects.values_list('pk', flat=True))
+
+    def create_users(self, count):
+        """Создание пользователей."""
+        password = make_password('benchmark')
+        return self.bulk_create(User, [
+            User(
+                email=EMAIL_TEMPLATE.format(number),
+                username=f'bench{number}',
+                first_name='Бенч',
+                last_name=f'Марк {number}',
+                password=password,
+            )
+            for number in range(count)
+        ])
+
+    def create_recipes(self, count, users, tags, amounts):
+        """Создание рецептов с тегами и ингредиентами."""
+        recipes = []
+        for start in range(0, count, self.batch_size):
+            batch = self.bulk_create(Recipe, [
+                Recipe(
+                    name=f'Рецепт {number}',
+                    text='Описание рецепта для бенчмарка. ' * 10,
+                    image='benchmark.png',
+                    cooking_time=self.random.randint(5, 180),
+                    author_id=self.random.choice(users),
+                )
+                for number in range(
+                    start, min(start + self.batch_size, count)
+                )
+            ])
+            self.bulk_link(Recipe.tags.through, (
+                {'recipe_id': recipe, 'tag_id': tag}
+                for recipe in batch
+                for tag in self.random.sample(
+                    tags, self.random.randint(1, len(tags))
+                )
+            ))
+            self.bulk_link(Recipe.ingredients.through, (
+                {'recipe_id': recipe, 'countofingredient_id': amount}
+                for recipe in batch
+                for amount in self.random.sample(
+                    amounts, self.random.randint(3, 15)
+                )
+            ))
+            recipes.extend(batch)
+        return recipes
+
+    def create_relations(self, users, recipes):
+        """Создание избранного, подписок и списков покупок."""
+        self.bulk_link(Favorite, (
+            {'user_id': user, 'recipe_id': recipe}
+            for user in users
+            for recipe in self.random.sample(
+                recipes, min(len(recipes), self.random.randint(0, 30))
+            )
+        ))
+        self.bulk_link(Subscribe, (
+            {'user_id': user, 'author_id': author}
+            for user in users
+            for author in self.random.sample(
+                users, min(len(users), self.random.randint(0, 10))
+            )
+            if author != user
+        ))
+        self.bulk_link(ShoppingCart, (
+            {'user_id': user, 'recipe_id': recipe}
+            for user in users
+            for recipe in self.random.sample(
+                recipes, min(len(recipes), self.random.randint(0, 20))
+            )
+        ))
+        for start in range(0, len(users), self.batch_size):
+            ShoppingListItem.objects.rebuild(
+                users[start:start + self.batch_size]
+            )
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+# Индексы pg_trgm для поиска ингредиентов в PostgreSQL больше не создаются:
+# поиск ?name= выполняется по индексу в памяти (recipes.search). Миграция
+# оставлена для баз, где она уже применена, индексы удаляет 0002.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '__first__'),
+    ]
+
+    operations = []
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+INDEXES = (
+    'recipes_ingredient_search_trgm',
+    'recipes_ingredient_search_prefix',
+)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_ingredient_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_indexes, migrations.RunPython.noop),
+    ]
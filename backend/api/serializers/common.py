@@ -1,14 +1,18 @@
 """Сериалайзеры приложения api."""
 
-from django.shortcuts import get_object_or_404
-from drf_extra_fields.fields import Base64ImageField
+from django.conf import settings
+from django.db import transaction
 from rest_framework.serializers import (CharField, IntegerField, ListField,
-                                        ModelSerializer, SerializerMethodField,
-                                        SlugRelatedField, ValidationError)
+                                        ModelSerializer, Serializer,
+                                        SerializerMethodField, ValidationError)
 
+from recipes.images import schedule_processing
 from recipes.models import CountOfIngredient, Ingredient, Recipe, Tag
 from users.v1.serializers import UserSerializer
-from users.models import ShoppingCart
+from users.models import ShoppingListItem
+
+from .fields import Base64ImageField, ImageSrcsetField
+from .viewer import get_viewer
 
 
 class TagSerializer(ModelSerializer):
@@ -31,6 +35,16 @@ class IngredientSerializer(ModelSerializer):
         fields = '__all__'
 
 
+class RecipeIdsSerializer(Serializer):
+    """Сериализатор списка идентификаторов рецептов."""
+
+    recipes = ListField(
+        child=IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.RECIPE_BATCH_MAX_SIZE,
+    )
+
+
 class RecipeIngredientWriteSerializer(ModelSerializer):
     """Сериализатор RecipeIngredientWriteSerializer."""
 
@@ -77,44 +91,30 @@ class RecipeReadSerializer(ModelSerializer):
     ingredients = RecipeIngredientReadSerializer(many=True)
     is_favorited = SerializerMethodField()
     is_in_shopping_cart = SerializerMethodField()
+    image_srcset = ImageSrcsetField()
 
     class Meta:
         """Мета класс RecipeReadSerializer."""
 
         model = Recipe
-        fields = '__all__'
+        exclude = ('image_variants', 'favorites_count', 'in_carts_count')
 
     def get_is_favorited(self, obj):
-        """Подписки."""
-        user = self.context['request'].user
-        return (
-            user.is_authenticated
-            and user.favorites.filter(recipe=obj).exists()
-        )
+        """Избранное."""
+        return get_viewer(self.context, recipes=(obj,)).is_favorited(obj)
 
     def get_is_in_shopping_cart(self, obj):
         """Список покупок."""
-        user = self.context['request'].user
-        try:
-            return (
-                user.is_authenticated
-                and user.shopping_cart.recipes.filter(pk__in=(obj.pk,))
-                .exists()
-            )
-        except ShoppingCart.DoesNotExist:
-            return False
+        return get_viewer(
+            self.context, recipes=(obj,)
+        ).is_in_shopping_cart(obj)
 
 
 class RecipeWriteSerializer(ModelSerializer):
     """Сериализатор RecipeWriteSerializer."""
 
     ingredients = RecipeIngredientWriteSerializer(many=True)
-    tags = ListField(
-        child=SlugRelatedField(
-            slug_field='id',
-            queryset=Tag.objects.all()
-        )
-    )
+    tags = ListField(child=IntegerField())
     image = Base64ImageField()
 
     class Meta:
@@ -138,19 +138,40 @@ class RecipeWriteSerializer(ModelSerializer):
             }
         }
 
+    def validate_tags(self, value):
+        """Получение тегов одним запросом."""
+        tags = Tag.objects.in_bulk(value)
+        if len(tags) < len(set(value)):
+            raise ValidationError('Такого тега не существует!')
+        return [tags[pk] for pk in value]
+
     def validate(self, attrs):
-        """Валидация."""
-        if attrs['cooking_time'] < 1:
+        """Валидация.
+
+        При частичном обновлении проверяются только переданные поля.
+        """
+        if 'cooking_time' in attrs and attrs['cooking_time'] < 1:
             raise ValidationError('Время приготовления не может быть меньше '
                                   'одной минуты!')
-        if len(attrs['tags']) == 0:
+        if 'tags' in attrs:
+            self.check_tags(attrs['tags'])
+        if 'ingredients' in attrs:
+            self.check_ingredients(attrs['ingredients'])
+        return attrs
+
+    def check_tags(self, tags):
+        """Проверка тегов."""
+        if len(tags) == 0:
             raise ValidationError('Рецепт не может быть без тегов!')
-        if len(attrs['tags']) > len(set(attrs['tags'])):
+        if len(tags) > len(set(tags)):
             raise ValidationError('Теги не могут повторяться!')
-        if len(attrs['ingredients']) == 0:
+
+    def check_ingredients(self, ingredients):
+        """Проверка ингредиентов."""
+        if len(ingredients) == 0:
             raise ValidationError('Рецепт не может быть без ингредиентов!')
         id_ingredients = []
-        for ingredient in attrs['ingredients']:
+        for ingredient in ingredients:
             if ingredient['amount'] < 1:
                 raise ValidationError(
                     'Количество ингредиента не может быть меньше одного!'
@@ -158,34 +179,73 @@ class RecipeWriteSerializer(ModelSerializer):
             id_ingredients.append(ingredient['id'])
         if len(id_ingredients) > len(set(id_ingredients)):
             raise ValidationError('Ингредиенты не могут повторяться!')
-        return attrs
+        if len(Ingredient.objects.in_bulk(id_ingredients)) < len(
+            id_ingredients
+        ):
+            raise ValidationError('Такого ингредиента не существует!')
+
+    def get_counts_of_ingredients(self, ingredients):
+        """Идентификаторы количеств ингредиентов, созданных одним запросом."""
+        pairs = [
+            (ingredient['id'], ingredient['amount'])
+            for ingredient in ingredients
+        ]
+        CountOfIngredient.objects.bulk_create(
+            (
+                CountOfIngredient(ingredient_id=ingredient, amount=amount)
+                for ingredient, amount in pairs
+            ),
+            ignore_conflicts=True
+        )
+        counts = {
+            (ingredient, amount): pk
+            for pk, ingredient, amount in CountOfIngredient.objects.filter(
+                ingredient__in={ingredient for ingredient, _ in pairs},
+                amount__in={amount for _, amount in pairs}
+            ).values_list('pk', 'ingredient', 'amount')
+        }
+        return [counts[pair] for pair in pairs]
 
     def add_ingredients_and_tags(self, instance, validated_data):
         """Добавление ингредиентов и тегов."""
         ingredients, tags = (
             validated_data.pop('ingredients'), validated_data.pop('tags')
         )
-        for ingredient in ingredients:
-            count_of_ingredient, _ = CountOfIngredient.objects.get_or_create(
-                ingredient=get_object_or_404(Ingredient, pk=ingredient['id']),
-                amount=ingredient['amount']
-            )
-            instance.ingredients.add(count_of_ingredient)
-        for tag in tags:
-            instance.tags.add(tag)
+        instance.ingredients.add(*self.get_counts_of_ingredients(ingredients))
+        instance.tags.add(*tags)
         return instance
 
+    @transaction.atomic
     def create(self, validated_data):
         """Создание."""
         saved = {}
         saved['ingredients'] = validated_data.pop('ingredients')
         saved['tags'] = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
+        schedule_processing(recipe)
         return self.add_ingredients_and_tags(recipe, saved)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        """Обновление."""
-        instance.ingredients.clear()
-        instance.tags.clear()
-        instance = self.add_ingredients_and_tags(instance, validated_data)
-        return super().update(instance, validated_data)
+        """Обновление только изменившихся тегов и ингредиентов."""
+        ingredients = validated_data.pop('ingredients', None)
+        tags = validated_data.pop('tags', None)
+        if tags is not None:
+            instance.tags.set(tags)
+        if ingredients is not None:
+            self.update_ingredients(instance, ingredients)
+        instance = super().update(instance, validated_data)
+        if 'image' in validated_data:
+            schedule_processing(instance)
+        return instance
+
+    def update_ingredients(self, instance, ingredients):
+        """Замена ингредиентов рецепта по разнице с текущими."""
+        old_amounts = ShoppingListItem.objects.recipe_amounts((instance,))
+        new_amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients
+        }
+        if old_amounts == new_amounts:
+            return
+        instance.ingredients.set(self.get_counts_of_ingredients(ingredients))
@@ -0,0 +1,140 @@
+"""Поля сериалайзеров приложения api."""
+
+import binascii
+import uuid
+from base64 import b64decode
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, UnidentifiedImageError
+from rest_framework.fields import Field, ImageField
+
+from recipes.storage import recipe_images_storage
+
+# Размер фрагмента base64, кратный четырём символам.
+BASE64_CHUNK_SIZE = 64 * 1024
+# Форматы изображений по первым байтам файла.
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+)
+IMAGE_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif'}
+
+
+class ImageSrcsetField(Field):
+    """Значение srcset из вариантов изображения рецепта."""
+
+    def __init__(self, **kwargs):
+        """Поле только для чтения из Recipe.image_variants."""
+        kwargs.setdefault('source', 'image_variants')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants):
+        """Ссылки на варианты с шириной в пикселях."""
+        request = self.context.get('request')
+        srcset = []
+        for width, name in variants:
+            url = recipe_images_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            srcset.append(f'{url} {width}w')
+        return ', '.join(srcset)
+
+
+class Base64ImageField(ImageField):
+    """Изображение в base64, декодируемое по частям.
+
+    Строка декодируется фрагментами во временный файл, который остаётся
+    в памяти до FILE_UPLOAD_MAX_MEMORY_SIZE и затем переносится на диск.
+    Размер проверяется по длине строки до декодирования, формат по первым
+    байтам, а размеры изображения по заголовку до чтения пикселей.
+    """
+
+    default_error_messages = {
+        'invalid': 'Загрузите корректное изображение.',
+        'invalid_type': 'Поддерживаются изображения JPEG, PNG и GIF.',
+        'max_size': 'Размер изображения не может превышать {max_size} МБ.',
+        'max_pixels': 'Изображение не может быть больше {max_pixels} '
+                      'мегапикселей.',
+    }
+
+    def to_internal_value(self, data):
+        """Файл изображения из строки base64 или data URI."""
+        if not isinstance(data, str) or not data:
+            self.fail('invalid')
+        start = data.find(';base64,')
+        start = 0 if start == -1 else start + len(';base64,')
+        if (len(data) - start) // 4 * 3 > settings.RECIPE_IMAGE_MAX_SIZE:
+            self.fail(
+                'max_size',
+                max_size=settings.RECIPE_IMAGE_MAX_SIZE // (1024 * 1024),
+            )
+        file = SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        try:
+            image_format = self.decode(data, start, file)
+            self.check_image(file, image_format)
+        except Exception:
+            file.close()
+            raise
+        size = file.tell()
+        file.seek(0)
+        return UploadedFile(
+            file=file,
+            name=f'{uuid.uuid4()}.{IMAGE_EXTENSIONS[image_format]}',
+            content_type=Image.MIME[image_format],
+            size=size,
+        )
+
+    def decode(self, data, start, file):
+        """Декодирование строки в файл, возвращает формат изображения."""
+        image_format, remainder = None, ''
+        for position in range(start, len(data), BASE64_CHUNK_SIZE):
+            chunk = remainder + ''.join(
+                data[position:position + BASE64_CHUNK_SIZE].split()
+            )
+            end = len(chunk) - len(chunk) % 4
+            chunk, remainder = chunk[:end], chunk[end:]
+            try:
+                decoded = b64decode(chunk, validate=True)
+            except binascii.Error:
+                self.fail('invalid')
+            if image_format is None:
+                image_format = self.get_format(decoded)
+            file.write(decoded)
+        if remainder or image_format is None:
+            self.fail('invalid')
+        return image_format
+
+    def get_format(self, header):
+        """Формат изображения по сигнатуре в начале файла."""
+        for signature, image_format in IMAGE_SIGNATURES:
+            if header.startswith(signature):
+                return image_format
+        return self.fail('invalid_type')
+
+    def check_image(self, file, image_format):
+        """Проверка заголовка и размеров изображения без декодирования."""
+        file.seek(0)
+        try:
+            image = Image.open(file)
+            if image.format != image_format:
+                self.fail('invalid_type')
+            width, height = image.size
+            if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+                self.fail(
+                    'max_pixels',
+                    max_pixels=settings.RECIPE_IMAGE_MAX_PIXELS // 10 ** 6,
+                )
+            image.verify()
+        except (
+            OSError, SyntaxError, ValueError,
+            UnidentifiedImageError, Image.DecompressionBombError,
+        ):
+            self.fail('invalid')
+        file.seek(0, 2)
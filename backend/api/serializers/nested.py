@@ -3,12 +3,16 @@ from rest_framework.serializers import ModelSerializer
 
 from recipes.models import Recipe
 
+from .fields import ImageSrcsetField
+
 
 class RecipeShortReadSerializer(ModelSerializer):
     """Сериализатор RecipeShortReadSerializer."""
 
+    image_srcset = ImageSrcsetField()
+
     class Meta:
         """Мета класс RecipeShortReadSerializer."""
 
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_srcset', 'cooking_time')
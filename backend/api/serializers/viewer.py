@@ -0,0 +1,57 @@
+"""Связи текущего пользователя с объектами ответа."""
+
+from recipes.models import Favorite
+from users.models import ShoppingCart, Subscribe
+
+
+class ViewerContext:
+    """Подписки, избранное и список покупок текущего пользователя.
+
+    Идентификаторы загружаются тремя запросами только для рецептов
+    и авторов ответа, после чего сериализаторы проверяют флаги
+    по множествам без обращений к базе данных.
+    """
+
+    def __init__(self, user, recipes=(), authors=()):
+        """Загрузка связей пользователя с рецептами и авторами."""
+        self.subscriptions = self.favorites = self.cart = frozenset()
+        if not user.is_authenticated:
+            return
+        recipe_ids = {recipe.pk for recipe in recipes}
+        author_ids = {author.pk for author in authors} | {
+            recipe.author_id for recipe in recipes
+        }
+        if author_ids:
+            self.subscriptions = set(Subscribe.objects.filter(
+                user=user, author__in=author_ids
+            ).values_list('author_id', flat=True))
+        if recipe_ids:
+            self.favorites = set(Favorite.objects.filter(
+                user=user, recipe__in=recipe_ids
+            ).values_list('recipe_id', flat=True))
+            self.cart = set(ShoppingCart.objects.filter(
+                user=user, recipe__in=recipe_ids
+            ).values_list('recipe_id', flat=True))
+
+    def is_subscribed(self, author):
+        """Подписан ли пользователь на автора."""
+        return author.pk in self.subscriptions
+
+    def is_favorited(self, recipe):
+        """Находится ли рецепт в избранном."""
+        return recipe.pk in self.favorites
+
+    def is_in_shopping_cart(self, recipe):
+        """Находится ли рецепт в списке покупок."""
+        return recipe.pk in self.cart
+
+
+def get_viewer(context, **objects):
+    """Связи пользователя из контекста сериализатора.
+
+    Если представление не загрузило их заранее, связи загружаются
+    для переданных объектов.
+    """
+    if 'viewer' in context:
+        return context['viewer']
+    return ViewerContext(context['request'].user, **objects)
@@ -0,0 +1,89 @@
+"""Тесты пакетного добавления и удаления рецептов."""
+
+from django.conf import settings
+from rest_framework.test import APITestCase
+
+from recipes.models import Favorite, Recipe
+from users.models import ShoppingCart, User
+
+ENDPOINTS = {
+    '/api/v1/recipes/favorite/': Favorite,
+    '/api/v1/recipes/shopping_cart/': ShoppingCart,
+}
+
+
+class RecipeBatchTest(APITestCase):
+    """Статус каждого рецепта в ответе пакетного запроса."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Пользователь и рецепты."""
+        cls.user = User.objects.create_user('user', 'user@mail.ru', 'password')
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {number}', text='Текст', image='recipe.jpg',
+                cooking_time=10, author=cls.user,
+            ).pk
+            for number in range(3)
+        ]
+        cls.missing = max(cls.recipes) + 1
+
+    def setUp(self):
+        """Авторизованный клиент."""
+        self.client.force_authenticate(self.user)
+
+    def statuses(self, method, url, recipes):
+        """Статусы рецептов в ответе."""
+        response = getattr(self.client, method)(
+            url, {'recipes': recipes}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return [
+            (result['id'], result['status'])
+            for result in response.json()['results']
+        ]
+
+    def test_statuses(self):
+        """added, exists, removed, absent и not_found."""
+        first, second, third = self.recipes
+        for url, model in ENDPOINTS.items():
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.statuses('post', url, [first, self.missing]),
+                    [(first, 'added'), (self.missing, 'not_found')],
+                )
+                self.assertEqual(
+                    self.statuses('post', url, [first, second]),
+                    [(first, 'exists'), (second, 'added')],
+                )
+                self.assertEqual(
+                    self.statuses('delete', url, [second, third]),
+                    [(second, 'removed'), (third, 'absent')],
+                )
+                self.assertEqual(
+                    list(model.objects.filter(user=self.user).values_list(
+                        'recipe', flat=True
+                    )),
+                    [first],
+                )
+
+    def test_invalid(self):
+        """Пустой и слишком длинный список отклоняются."""
+        too_many = list(range(1, settings.RECIPE_BATCH_MAX_SIZE + 2))
+        for url in ENDPOINTS:
+            for recipes in ([], too_many, ['x'], [0]):
+                with self.subTest(url=url, recipes=recipes[:3]):
+                    response = self.client.post(
+                        url, {'recipes': recipes}, format='json'
+                    )
+                    self.assertEqual(response.status_code, 400)
+
+    def test_anonymous(self):
+        """Пакетные запросы доступны только авторизованным."""
+        self.client.force_authenticate(None)
+        for url in ENDPOINTS:
+            with self.subTest(url=url):
+                response = self.client.post(
+                    url, {'recipes': self.recipes}, format='json'
+                )
+                self.assertEqual(response.status_code, 401)
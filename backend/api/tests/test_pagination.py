@@ -0,0 +1,91 @@
+"""Тесты пагинации по курсору."""
+
+import json
+from base64 import urlsafe_b64encode
+
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe
+from users.models import User
+
+URL = '/api/v1/recipes/'
+
+
+class CursorPaginationTest(APITestCase):
+    """Обход страниц по курсору вперёд и назад."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Рецепты с повторяющимся временем приготовления."""
+        author = User.objects.create_user(
+            'author', 'author@mail.ru', 'password'
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {number}', text='Текст', image='recipe.jpg',
+                cooking_time=number % 3 + 1, author=author,
+            )
+            for number in range(7)
+        ]
+
+    def page(self, url, **params):
+        """Номера рецептов на странице и ссылки на соседние страницы."""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        ids = [recipe['id'] for recipe in data['results']]
+        return ids, data['next'], data['previous']
+
+    def walk(self, **params):
+        """Проход вперёд до конца и назад до начала."""
+        ids, next_link, previous = self.page(URL, cursor='', limit=3, **params)
+        self.assertIsNone(previous)
+        pages = [ids]
+        while next_link:
+            ids, next_link, previous = self.page(next_link)
+            pages.append(ids)
+        backward = [ids]
+        while previous:
+            ids, _, previous = self.page(previous)
+            backward.append(ids)
+        self.assertEqual(backward[::-1], pages)
+        return sum(pages, [])
+
+    def test_newest(self):
+        """Сортировка по умолчанию от новых к старым."""
+        self.assertEqual(
+            self.walk(),
+            [recipe.pk for recipe in reversed(self.recipes)],
+        )
+
+    def test_cooking_time(self):
+        """Сортировка с повторяющимися значениями поля."""
+        expected = [
+            recipe.pk for recipe in sorted(
+                self.recipes,
+                key=lambda recipe: (recipe.cooking_time, -recipe.pk),
+            )
+        ]
+        self.assertEqual(self.walk(ordering='cooking_time'), expected)
+
+    def test_trending(self):
+        """Сортировка по аннотации."""
+        self.assertEqual(
+            self.walk(ordering='trending'),
+            [recipe.pk for recipe in reversed(self.recipes)],
+        )
+
+    def test_invalid_cursor(self):
+        """Испорченный курсор даёт 404, а не ошибку сервера."""
+        cursors = [
+            'x', {'v': 1}, {'v': []}, {'v': ['x']}, {'v': [None]},
+            {'v': [{}]}, {'v': [[1]]}, {'r': 1},
+        ]
+        for cursor in cursors:
+            encoded = (
+                cursor if isinstance(cursor, str)
+                else urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+            )
+            with self.subTest(cursor=cursor):
+                response = self.client.get(URL, {'cursor': encoded})
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,41 @@
+"""Тесты добавления рецепта в избранное и список покупок."""
+
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe
+from users.models import User
+
+PATHS = ('favorite', 'shopping_cart')
+
+
+class RecipeLinkTest(APITestCase):
+    """Статусы ответов при добавлении и удалении одного рецепта."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Пользователь и рецепт."""
+        cls.user = User.objects.create_user('user', 'user@mail.ru', 'password')
+        cls.recipe = Recipe.objects.create(
+            name='Рецепт', text='Текст', image='recipe.jpg', cooking_time=10,
+            author=cls.user,
+        )
+
+    def setUp(self):
+        """Авторизованный клиент."""
+        self.client.force_authenticate(self.user)
+
+    def test_statuses(self):
+        """201 и 204, повтор 400, несуществующий рецепт 404."""
+        missing = self.recipe.pk + 1
+        for path in PATHS:
+            url = f'/api/v1/recipes/{self.recipe.pk}/{path}/'
+            with self.subTest(path=path):
+                response = self.client.post(url)
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(response.json()['id'], self.recipe.pk)
+                self.assertEqual(self.client.post(url).status_code, 400)
+                self.assertEqual(self.client.delete(url).status_code, 204)
+                self.assertEqual(self.client.delete(url).status_code, 400)
+                url = f'/api/v1/recipes/{missing}/{path}/'
+                self.assertEqual(self.client.post(url).status_code, 404)
+                self.assertEqual(self.client.delete(url).status_code, 404)
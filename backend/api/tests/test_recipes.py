@@ -0,0 +1,31 @@
+"""Тесты ответа со списком рецептов."""
+
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe
+from users.models import User
+
+
+class RecipeReadTest(APITestCase):
+    """Поля рецепта в ответе API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Рецепт."""
+        author = User.objects.create_user(
+            'author', 'author@mail.ru', 'password'
+        )
+        cls.recipe = Recipe.objects.create(
+            name='Рецепт', text='Текст', image='recipe.jpg',
+            cooking_time=10, author=author,
+        )
+
+    def test_fields(self):
+        """Служебные счётчики и варианты изображения не отдаются."""
+        response = self.client.get(f'/api/v1/recipes/{self.recipe.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {
+            'id', 'tags', 'author', 'ingredients', 'is_favorited',
+            'is_in_shopping_cart', 'name', 'image', 'image_srcset', 'text',
+            'cooking_time',
+        })
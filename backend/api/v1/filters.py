@@ -1,41 +1,43 @@
 """Фильтр."""
 
-from django.db.models import IntegerField, Value
-from django_filters.rest_framework import (AllValuesMultipleFilter,
-                                           BooleanFilter, CharFilter,
-                                           FilterSet)
+from django.core.cache import cache
+from django.db.models import Count, Exists, FloatField, OuterRef, Value
+from django.db.models.functions import Coalesce
+from django_filters.rest_framework import (BooleanFilter, ChoiceFilter,
+                                           FilterSet, MultipleChoiceFilter)
 
-from recipes.models import Ingredient, Recipe
+from foodgram.cache import get_version
+from recipes.models import Recipe, Tag
 
+TAGS_MATCH_ANY = 'any'
+TAGS_MATCH_ALL = 'all'
 
-class IngredientSearchFilter(FilterSet):
-    """Фильтр для ингредиентов."""
 
-    name = CharFilter(method='search_by_name')
+def get_tag_map():
+    """Словарь слаг -> id тегов из кеша.
 
-    class Meta:
-        """Мета класс фильтра ингредиентов."""
+    Ключ содержит версию тегов, поэтому после изменения тега словарь
+    строится заново одним запросом.
+    """
+    key = f'api:tag-map:{get_version(Tag)}'
+    tag_map = cache.get(key)
+    if tag_map is None:
+        tag_map = dict(Tag.objects.values_list('slug', 'pk'))
+        cache.set(key, tag_map, None)
+    return tag_map
 
-        model = Ingredient
-        fields = ('name',)
 
-    def search_by_name(self, queryset, name, value):
-        """Поиск по имени."""
-        if not value:
-            return queryset
-        start_with_queryset = (
-            queryset.filter(name__istartswith=value).annotate(
-                order=Value(0, IntegerField())
-            )
-        )
-        contain_queryset = (
-            queryset.filter(name__icontains=value).exclude(
-                pk__in=(ingredient.pk for ingredient in start_with_queryset)
-            ).annotate(
-                order=Value(1, IntegerField())
-            )
-        )
-        return start_with_queryset.union(contain_queryset).order_by('order')
+def tag_choices():
+    """Варианты значений фильтра тегов."""
+    return [(slug, slug) for slug in get_tag_map()]
+
+
+RECIPE_ORDERINGS = {
+    'newest': ('-pk',),
+    'popular': ('-favorites_count', '-pk'),
+    'trending': ('-trending_score', '-pk'),
+    'cooking_time': ('cooking_time', '-pk'),
+}
 
 
 class RecipeFilter(FilterSet):
@@ -43,7 +45,15 @@ class RecipeFilter(FilterSet):
 
     is_favorited = BooleanFilter(method='get_is_favorited')
     is_in_shopping_cart = BooleanFilter(method='get_is_in_shopping_cart')
-    tags = AllValuesMultipleFilter(field_name='tags__slug')
+    tags = MultipleChoiceFilter(choices=tag_choices, method='get_tags')
+    tags_match = ChoiceFilter(
+        choices=((TAGS_MATCH_ANY, 'any'), (TAGS_MATCH_ALL, 'all')),
+        method='get_tags_match',
+    )
+    ordering = ChoiceFilter(
+        choices=[(ordering, ordering) for ordering in RECIPE_ORDERINGS],
+        method='get_ordering',
+    )
 
     class Meta:
         """Мета класс фильтра рецептов."""
@@ -62,3 +72,36 @@ class RecipeFilter(FilterSet):
         if not value:
             return queryset
         return queryset.filter(in_shopping_cart__user=self.request.user)
+
+    def get_tags(self, queryset, name, value):
+        """Рецепты с любым или со всеми из указанных тегов.
+
+        Фильтр строится одним подзапросом EXISTS без соединения
+        с таблицей тегов, поэтому строки рецептов не размножаются.
+        """
+        if not value:
+            return queryset
+        tag_map = get_tag_map()
+        tags = {tag_map[slug] for slug in value}
+        recipe_tags = Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'), tag__in=tags
+        )
+        if self.form.cleaned_data.get('tags_match') == TAGS_MATCH_ALL:
+            recipe_tags = recipe_tags.values('recipe').annotate(
+                matched=Count('tag', distinct=True)
+            ).filter(matched=len(tags))
+        return queryset.filter(Exists(recipe_tags))
+
+    def get_tags_match(self, queryset, name, value):
+        """Режим фильтра тегов применяется в get_tags."""
+        return queryset
+
+    def get_ordering(self, queryset, name, value):
+        """Сортировка рецептов: новые, популярные, в тренде, по времени."""
+        if not value:
+            return queryset
+        if value == 'trending':
+            queryset = queryset.annotate(trending_score=Coalesce(
+                'trending__score', Value(0.0), output_field=FloatField()
+            ))
+        return queryset.order_by(*RECIPE_ORDERINGS[value])
@@ -1,10 +1,152 @@
 """Миксины."""
 
+import json
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
 from rest_framework.viewsets import GenericViewSet
 
+from api.serializers.common import RecipeIdsSerializer
+from api.serializers.viewer import ViewerContext
+from foodgram.cache import get_version
+from recipes.models import Recipe
+
 
 class ListRetrieveViewSet(ListModelMixin, RetrieveModelMixin, GenericViewSet):
     """Класс миксин."""
 
     pass
+
+
+def make_etag(data):
+    """Строгий ETag сериализованных данных."""
+    content = json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False, sort_keys=True
+    )
+    return quote_etag(sha1(content.encode()).hexdigest())
+
+
+class CachedReadMixin:
+    """Кеширование ответов справочников с поддержкой ETag.
+
+    Сериализованные данные хранятся в кеше под ключом с версией модели,
+    которая меняется при каждом сохранении или удалении записи.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """Список из кеша."""
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Объект из кеша."""
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_key(self, request):
+        """Ключ кеша для версии модели и адреса запроса."""
+        model = self.queryset.model
+        path = sha1(request.get_full_path().encode()).hexdigest()
+        return f'api:{model._meta.label_lower}:{get_version(model)}:{path}'
+
+    def cached(self, view, request, *args, **kwargs):
+        """Ответ из кеша или от view с сохранением в кеш."""
+        key = self.get_cache_key(request)
+        cached = cache.get(key)
+        if cached is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != HTTP_200_OK:
+                return response
+            cached = (response.data, make_etag(response.data))
+            cache.set(key, cached, settings.REFERENCE_CACHE_TIMEOUT)
+        data, etag = cached
+        if self.is_not_modified(request, etag):
+            response = Response(status=HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.REFERENCE_CACHE_MAX_AGE,
+            must_revalidate=True,
+        )
+        return response
+
+    def is_not_modified(self, request, etag):
+        """Совпадает ли ETag с заголовком If-None-Match."""
+        header = request.headers.get('If-None-Match')
+        if not header:
+            return False
+        etags = parse_etags(header)
+        return '*' in etags or etag in {
+            tag[2:] if tag.startswith('W/') else tag for tag in etags
+        }
+
+
+class ViewerContextMixin:
+    """Связи текущего пользователя с объектами ответа в контексте.
+
+    Атрибут viewer_objects указывает, чем являются сериализуемые объекты:
+    рецептами (``recipes``) или авторами (``authors``).
+    """
+
+    viewer_objects = 'recipes'
+
+    def get_viewer_context(self, objects):
+        """Контекст сериализатора со связями пользователя."""
+        context = self.get_serializer_context()
+        context['viewer'] = ViewerContext(
+            self.request.user, **{self.viewer_objects: objects}
+        )
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        """Сериализатор ответа со связями пользователя в контексте."""
+        if args and 'data' not in kwargs and 'context' not in kwargs:
+            objects = args[0] if kwargs.get('many') else (args[0],)
+            kwargs['context'] = self.get_viewer_context(objects)
+        return super().get_serializer(*args, **kwargs)
+
+
+class RecipeBatchMixin:
+    """Добавление и удаление нескольких рецептов одним запросом.
+
+    Тело запроса: ``{"recipes": [1, 2, 3]}``. Менеджер связи должен
+    реализовывать add_recipes и remove_recipes, возвращающие
+    идентификаторы рецептов, для которых связь изменилась.
+    """
+
+    batch_statuses = {
+        'POST': ('added', 'exists'),
+        'DELETE': ('removed', 'absent'),
+    }
+
+    def batch_response(self, request, manager):
+        """Изменение связей с рецептами и статус каждого рецепта."""
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.validated_data['recipes']
+        found = Recipe.objects.only('pk').in_bulk(recipes)
+        if request.method == 'POST':
+            changed = manager.add_recipes(request.user, list(found))
+        else:
+            changed = manager.remove_recipes(request.user, list(found))
+        changed = set(changed)
+        done, skipped = self.batch_statuses[request.method]
+        return Response({'results': [
+            {
+                'id': recipe,
+                'status': (
+                    done if recipe in changed
+                    else skipped if recipe in found
+                    else 'not_found'
+                ),
+            }
+            for recipe in recipes
+        ]})
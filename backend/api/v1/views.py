@@ -1,6 +1,6 @@
 """Классы представления приложения api."""
 
-from django.db import IntegrityError
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework.backends import DjangoFilterBackend
 from rest_framework.decorators import action
@@ -13,14 +13,16 @@ from rest_framework.viewsets import ModelViewSet
 from api.serializers.common import (IngredientSerializer, RecipeReadSerializer,
                                     RecipeWriteSerializer, TagSerializer)
 from api.serializers.nested import RecipeShortReadSerializer
-from api.v1.filters import IngredientSearchFilter, RecipeFilter
-from api.v1.mixins import ListRetrieveViewSet
+from api.v1.filters import RecipeFilter
+from api.v1.mixins import (CachedReadMixin, ListRetrieveViewSet,
+                           RecipeBatchMixin, ViewerContextMixin)
 from foodgram.pagination import LimitPageNumberPagination
-from recipes.models import Favorite, Ingredient, Recipe, Tag
+from recipes.models import CountOfIngredient, Favorite, Ingredient, Recipe, Tag
+from recipes.search import ingredient_autocomplete
 from users.permissions import IsAuthorOrAdminOrReadOnly
 
 
-class TagViewSet(ListRetrieveViewSet):
+class TagViewSet(CachedReadMixin, ListRetrieveViewSet):
     """Класс представления тега."""
 
     serializer_class = TagSerializer
@@ -28,17 +30,22 @@ class TagViewSet(ListRetrieveViewSet):
     http_method_names = ('get',)
 
 
-class IngredientViewSet(ListRetrieveViewSet):
+class IngredientViewSet(CachedReadMixin, ListRetrieveViewSet):
     """Класс представления ингредиента."""
 
     serializer_class = IngredientSerializer
-    filter_backends = (DjangoFilterBackend,)
-    filterset_class = IngredientSearchFilter
     queryset = Ingredient.objects.all()
     http_method_names = ('get',)
 
+    def list(self, request, *args, **kwargs):
+        """Поиск по названию ?name= отдаётся из индекса в памяти."""
+        name = request.query_params.get('name')
+        if name:
+            return Response(ingredient_autocomplete.lookup(name))
+        return super().list(request, *args, **kwargs)
+
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(RecipeBatchMixin, ViewerContextMixin, ModelViewSet):
     """Класс представления рецепта."""
 
     pagination_class = LimitPageNumberPagination
@@ -47,6 +54,27 @@ class RecipeViewSet(ModelViewSet):
     filterset_class = RecipeFilter
     queryset = Recipe.objects.all()
     http_method_names = ('get', 'post', 'put', 'patch', 'delete')
+    lookup_value_regex = r'\d+'
+
+    def get_queryset(self):
+        """Переопределение получения рецептов."""
+        if self.request.method not in SAFE_METHODS:
+            return self.queryset
+        return self.get_read_queryset()
+
+    def get_read_queryset(self):
+        """Рецепты с подгруженными связями.
+
+        Флаги подписки, избранного и списка покупок берутся из контекста
+        связей пользователя, который загружается для страницы целиком.
+        """
+        return self.queryset.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'ingredients',
+                queryset=CountOfIngredient.objects.select_related('ingredient')
+            ),
+        )
 
     def get_serializer_class(self):
         """Переопределение получения рецептов."""
@@ -63,9 +91,9 @@ class RecipeViewSet(ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
+        recipe = self.get_read_queryset().get(pk=serializer.instance.pk)
         serializer = RecipeReadSerializer(
-            instance=serializer.instance,
-            context={'request': self.request}
+            instance=recipe, context=self.get_viewer_context((recipe,))
         )
         headers = self.get_success_headers(serializer.data)
         return Response(
@@ -81,19 +109,23 @@ class RecipeViewSet(ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        recipe = self.get_read_queryset().get(pk=serializer.instance.pk)
         serializer = RecipeReadSerializer(
-            instance=serializer.instance,
-            context={'request': self.request}
+            instance=recipe, context=self.get_viewer_context((recipe,))
         )
         return Response(
             serializer.data, status=HTTP_200_OK
         )
 
-    def add_to_favorite(self, request, recipe):
-        """Добавление в избранное рецептов."""
-        try:
-            Favorite.objects.create(user=request.user, recipe=recipe)
-        except IntegrityError:
+    def add_to_favorite(self, request, pk):
+        """Добавление в избранное рецептов.
+
+        Рецепт загружается один раз после вставки: он нужен для ответа,
+        а если его нет, пустой RETURNING означает 404, а не повтор.
+        """
+        added = Favorite.objects.add_recipes(request.user, (pk,))
+        recipe = get_object_or_404(Recipe, pk=pk)
+        if not added:
             return Response(
                 {'errors': 'Вы уже подписаны!'},
                 status=HTTP_400_BAD_REQUEST
@@ -104,15 +136,14 @@ class RecipeViewSet(ModelViewSet):
             status=HTTP_201_CREATED
         )
 
-    def delete_from_favorite(self, request, recipe):
+    def delete_from_favorite(self, request, pk):
         """Удаление рецептов из избранных."""
-        favorite = Favorite.objects.filter(user=request.user, recipe=recipe)
-        if not favorite.exists():
+        if not Favorite.objects.remove_recipes(request.user, (pk,)):
+            get_object_or_404(Recipe, pk=pk)
             return Response(
                 {'errors': 'Подписки не существует!'},
                 status=HTTP_400_BAD_REQUEST
             )
-        favorite.delete()
         return Response(status=HTTP_204_NO_CONTENT)
 
     @action(
@@ -122,7 +153,16 @@ class RecipeViewSet(ModelViewSet):
     )
     def favorite(self, request, pk=None):
         """Добавление или удаление рецептов из избранных."""
-        recipe = get_object_or_404(Recipe, pk=pk)
         if request.method == 'POST':
-            return self.add_to_favorite(request, recipe)
-        return self.delete_from_favorite(request, recipe)
+            return self.add_to_favorite(request, int(pk))
+        return self.delete_from_favorite(request, int(pk))
+
+    @action(
+        methods=('post', 'delete'),
+        detail=False,
+        url_path='favorite',
+        permission_classes=(IsAuthenticated,)
+    )
+    def favorite_batch(self, request):
+        """Добавление или удаление нескольких рецептов из избранных."""
+        return self.batch_response(request, Favorite.objects)
@@ -0,0 +1,32 @@
+"""ASGI."""
+
+import os
+
+import django
+from asgiref.sync import ThreadSensitiveContext
+
+from foodgram.handlers import StreamingASGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+
+django.setup(set_prefix=False)
+django_application = StreamingASGIHandler()
+
+
+async def application(scope, receive, send):
+    """Обработка запроса в собственном потоке.
+
+    Django 3.2 вызывает синхронные представления через
+    sync_to_async(thread_sensitive=True), то есть в одном общем потоке
+    процесса. Контекст запроса выделяет каждому запросу свой поток,
+    поэтому представления выполняются параллельно, а чтение тела запроса
+    и отправку ответа медленным клиентам обслуживает цикл событий.
+    Части потокового ответа формируются в том же потоке запроса.
+    """
+    async with ThreadSensitiveContext():
+        await django_application(scope, receive, send)
+
+
+from recipes.search import ingredient_autocomplete  # noqa: E402
+
+ingredient_autocomplete.warm()
@@ -0,0 +1,47 @@
+"""Версии данных в общем кеше."""
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Кеши, которые у каждого воркера свои.
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+def is_shared():
+    """Общий ли у воркеров кеш, то есть видят ли они смену версий."""
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_BACKENDS
+
+
+def version_key(model, pk=None):
+    """Ключ версии данных модели или отдельного объекта."""
+    if pk is None:
+        return f'version:{model._meta.label_lower}'
+    return f'version:{model._meta.label_lower}:{pk}'
+
+
+def get_version(model, pk=None):
+    """Текущая версия данных модели или отдельного объекта.
+
+    Версия хранится в общем кеше, поэтому её смену видят все воркеры.
+    Если ключ вытеснен из кеша, записывается новая версия, и старые
+    записи с прежней версией больше не используются.
+    """
+    key = version_key(model, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, timeout=None)
+        return cache.get(key)
+    return version
+
+
+def bump_version(model, pk=None):
+    """Смена версии данных после фиксации транзакции."""
+    transaction.on_commit(
+        lambda: cache.set(version_key(model, pk), uuid4().hex, timeout=None)
+    )
@@ -0,0 +1,29 @@
+"""Денормализованные счётчики."""
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def change_counter(queryset, field, delta):
+    """Атомарное изменение счётчика строк выборки на delta.
+
+    Счётчик меняется выражением F() в базе данных, поэтому параллельные
+    запросы не теряют обновления. Счётчик не опускается ниже нуля.
+    """
+    if not delta:
+        return
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def actual_count(source, field):
+    """Подзапрос с фактическим числом строк source для объекта."""
+    return Coalesce(
+        Subquery(
+            source.objects.filter(**{field: OuterRef('pk')})
+            .order_by().values(field)
+            .annotate(total=Count('pk')).values('total')
+        ),
+        0,
+    )
@@ -0,0 +1,55 @@
+"""Обработчики запросов."""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGI обработчик, читающий потоковые ответы в потоке запроса.
+
+    Django 3.2 перебирает потоковый ответ прямо в цикле событий, где
+    запросы к базе запрещены. Здесь каждая часть ответа запрашивается
+    через sync_to_async(thread_sensitive=True), то есть в том же потоке,
+    что и представление, а цикл событий только отправляет её клиенту.
+    """
+
+    async def send_response(self, response, send):
+        """Отправка ответа клиенту."""
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': self.response_headers(response),
+        })
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+    @staticmethod
+    def response_headers(response):
+        """Заголовки и cookies ответа в формате ASGI."""
+        headers = [
+            (
+                header.encode('ascii') if isinstance(header, str) else header,
+                value.encode('latin1') if isinstance(value, str) else value,
+            )
+            for header, value in response.items()
+        ]
+        headers.extend(
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+            for cookie in response.cookies.values()
+        )
+        return headers
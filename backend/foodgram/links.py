@@ -0,0 +1,126 @@
+"""Добавление и удаление связей одним запросом."""
+
+import sqlite3
+
+from django.db import connections
+
+
+def supports_returning(connection):
+    """Поддерживает ли база RETURNING в INSERT и DELETE."""
+    if connection.vendor == 'postgresql':
+        return True
+    return (
+        connection.vendor == 'sqlite'
+        and sqlite3.sqlite_version_info >= (3, 35)
+    )
+
+
+def supports_upsert(connection):
+    """Поддерживает ли база INSERT ... ON CONFLICT DO UPDATE."""
+    if connection.vendor == 'postgresql':
+        return True
+    return (
+        connection.vendor == 'sqlite'
+        and sqlite3.sqlite_version_info >= (3, 24)
+    )
+
+
+def columns(model, owner, target):
+    """Таблица связи и её столбцы."""
+    meta = model._meta
+    return (
+        meta.db_table,
+        meta.get_field(owner).column,
+        meta.get_field(target).column,
+    )
+
+
+def add_links(model, owner, owner_id, target, target_ids):
+    """Создание связей владельца с существующими объектами.
+
+    Выполняется одним запросом INSERT ... SELECT ... ON CONFLICT DO
+    NOTHING RETURNING: несуществующие объекты и уже созданные связи
+    пропускаются. Возвращает идентификаторы объектов новых связей.
+    Сигналы моделей не отправляются.
+    """
+    target_ids = list(target_ids)
+    if not target_ids:
+        return []
+    manager = model._default_manager
+    connection = connections[manager.db]
+    if not supports_returning(connection):
+        return add_links_fallback(model, owner, owner_id, target, target_ids)
+    table, owner_column, target_column = columns(model, owner, target)
+    related = model._meta.get_field(target).related_model._meta
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(target_ids))
+    sql = (
+        f'INSERT INTO {quote(table)} '
+        f'({quote(owner_column)}, {quote(target_column)}) '
+        f'SELECT %s, {quote(related.pk.column)} '
+        f'FROM {quote(related.db_table)} '
+        f'WHERE {quote(related.pk.column)} IN ({placeholders}) '
+        f'ON CONFLICT DO NOTHING RETURNING {quote(target_column)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (owner_id, *target_ids))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def add_links_fallback(model, owner, owner_id, target, target_ids):
+    """Создание связей двумя запросами для баз без RETURNING."""
+    manager = model._default_manager
+    target_model = model._meta.get_field(target).related_model
+    existing = set(manager.filter(**{
+        owner: owner_id, f'{target}__in': target_ids
+    }).values_list(target, flat=True))
+    added = [
+        pk for pk in target_model._default_manager.filter(
+            pk__in=target_ids
+        ).values_list('pk', flat=True)
+        if pk not in existing
+    ]
+    manager.bulk_create(
+        (
+            model(**{f'{owner}_id': owner_id, f'{target}_id': pk})
+            for pk in added
+        ),
+        ignore_conflicts=True,
+    )
+    return added
+
+
+def remove_links(model, owner, owner_id, target, target_ids):
+    """Удаление связей владельца одним запросом DELETE ... RETURNING.
+
+    Возвращает идентификаторы объектов удалённых связей. Сигналы моделей
+    не отправляются.
+    """
+    target_ids = list(target_ids)
+    if not target_ids:
+        return []
+    manager = model._default_manager
+    connection = connections[manager.db]
+    returning = supports_returning(connection)
+    if not returning:
+        target_ids = list(manager.filter(**{
+            owner: owner_id, f'{target}__in': target_ids
+        }).values_list(target, flat=True))
+        if not target_ids:
+            return []
+    table, owner_column, target_column = columns(model, owner, target)
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(target_ids))
+    sql = (
+        f'DELETE FROM {quote(table)} '
+        f'WHERE {quote(owner_column)} = %s '
+        f'AND {quote(target_column)} IN ({placeholders})'
+    )
+    if returning:
+        sql += f' RETURNING {quote(target_column)}'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (owner_id, *target_ids))
+        return (
+            [row[0] for row in cursor.fetchall()] if returning
+            else target_ids
+        )
@@ -0,0 +1,26 @@
+"""Промежуточные слои."""
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+
+
+class ReleaseConnectionsMiddleware:
+    """Возврат соединений с базой до отправки ответа под ASGI.
+
+    Django закрывает соединения по сигналу request_finished, то есть после
+    того, как ответ передан клиенту. Под ASGI медленный клиент держал бы
+    соединение всё время загрузки ответа, поэтому оно закрывается сразу
+    после формирования ответа в потоке представления. Потоковый ответ
+    читает базу во время отправки, его соединение закрывается как обычно.
+    """
+
+    def __init__(self, get_response):
+        """Следующий обработчик."""
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Закрытие соединений после формирования ответа."""
+        response = self.get_response(request)
+        if isinstance(request, ASGIRequest) and not response.streaming:
+            close_old_connections()
+        return response
@@ -1,10 +1,189 @@
 """Пагинация."""
 
+import json
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+ESTIMATED_ROWS = re.compile(r'rows=(\d+)')
+
+
+def estimated_count(queryset):
+    """Оценка числа строк по статистике планировщика PostgreSQL.
+
+    На других базах данных возвращается точное значение COUNT(*).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN {sql}', params)
+        plan = cursor.fetchone()[0]
+    match = ESTIMATED_ROWS.search(plan)
+    return int(match.group(1)) if match else queryset.count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который может брать число объектов из оценки планировщика."""
+
+    @cached_property
+    def count(self):
+        """Число объектов, точное или оценочное."""
+        if settings.PAGINATION_COUNT == 'estimate':
+            return estimated_count(self.object_list)
+        return super().count
 
 
 class LimitPageNumberPagination(PageNumberPagination):
-    """Лимит элементов на странице."""
+    """Лимит элементов на странице.
+
+    С параметром ``cursor`` включается пагинация по ключу сортировки:
+    страница выбирается условием на значения последнего объекта без
+    OFFSET, а ``count`` не считается (или оценивается, если
+    PAGINATION_COUNT = 'estimate'). Формат ответа не меняется.
+    """
 
     page_size_query_param = 'limit'
     page_size = 10
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    django_paginator_class = EstimatedCountPaginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Страница по номеру или по курсору."""
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.fields = [
+            self.get_field(queryset, field) for field in self.ordering
+        ]
+        queryset = queryset.order_by(*self.ordering)
+        self.count = (
+            estimated_count(queryset)
+            if settings.PAGINATION_COUNT == 'estimate' else None
+        )
+        values, self.reverse = self.decode_cursor(request)
+        if values is not None:
+            queryset = queryset.filter(self.keyset(values, self.reverse))
+        if self.reverse:
+            queryset = queryset.reverse()
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if self.reverse:
+            page.reverse()
+        self.has_next = has_more or self.reverse
+        self.has_previous = has_more if self.reverse else values is not None
+        self.page_objects = page
+        return page
+
+    def get_ordering(self, queryset):
+        """Поля сортировки выборки с первичным ключом в конце."""
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValueError(
+                'Пагинация по курсору поддерживает только сортировку по полям.'
+            )
+        if not {'pk', '-pk'} & set(ordering):
+            ordering.append('-pk')
+        return ordering
+
+    def get_field(self, queryset, field):
+        """Поле модели или аннотации, по которому идёт сортировка."""
+        name = field.lstrip('-')
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        if name == 'pk':
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(name)
+
+    def keyset(self, values, reverse):
+        """Условие «после» объекта с указанными значениями полей."""
+        condition, equal = Q(), Q()
+        for field, value in zip(self.ordering, values):
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request):
+        """Значения полей сортировки и направление из курсора."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()))
+            values, reverse = cursor['v'], bool(cursor.get('r'))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+            if None in values:
+                raise ValueError
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, instance, reverse=False):
+        """Ссылка на страницу после или перед объектом."""
+        cursor = {
+            'v': [
+                getattr(instance, field.lstrip('-'))
+                for field in self.ordering
+            ],
+        }
+        if reverse:
+            cursor['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        """Ссылка на следующую страницу."""
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.page_objects:
+            return None
+        return self.encode_cursor(self.page_objects[-1])
+
+    def get_previous_link(self):
+        """Ссылка на предыдущую страницу."""
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_objects:
+            return None
+        return self.encode_cursor(self.page_objects[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        """Ответ в формате постраничной пагинации."""
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict((
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        )))
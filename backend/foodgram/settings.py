@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram.middleware.ReleaseConnectionsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,7 +95,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ),
 }
 
@@ -127,6 +128,57 @@ STATIC_ROOT = BASE_DIR / 'static_backend/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media/'
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+AUTH_TOKEN_CACHE_SIZE = 10_000
+AUTH_TOKEN_CACHE_TIMEOUT = 60 * 5
+AUTH_TOKEN_CACHE_SHARED = (
+    os.getenv('AUTH_TOKEN_CACHE_SHARED', default='False') == 'True'
+)
+
+PAGINATION_COUNT = os.getenv('PAGINATION_COUNT', default='exact')
+
+REFERENCE_CACHE_TIMEOUT = int(
+    os.getenv('REFERENCE_CACHE_TIMEOUT', default=60 * 5)
+)
+REFERENCE_CACHE_MAX_AGE = 0
+
+RECIPE_BATCH_MAX_SIZE = 100
+
+INGREDIENT_SEARCH_LIMIT = 20
+INGREDIENT_AUTOCOMPLETE_MAX_AGE = 300
+
+TASK_BACKEND = os.getenv(
+    'TASK_BACKEND', default='recipes.tasks.ThreadPoolBackend'
+)
+TASK_WORKERS = 2
+
+RECIPE_IMAGE_DIR = 'recipes'
+RECIPE_IMAGE_WIDTHS = (160, 320, 640)
+RECIPE_IMAGE_FORMAT = 'WEBP'
+RECIPE_IMAGE_QUALITY = 80
+# Не больше client_max_body_size в nginx с учётом base64.
+RECIPE_IMAGE_MAX_SIZE = 15 * 1024 * 1024
+RECIPE_IMAGE_MAX_PIXELS = 40 * 10 ** 6
+MEDIA_GC_GRACE_PERIOD = 60 * 60
+
+TRENDING_WINDOW_DAYS = 7
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_SIZE = 1000
+
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    'SHOPPING_LIST_PDF_FONT',
+    default='/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
 # Подключаем свою модель юзверя
 AUTH_USER_MODEL = 'users.User'
 
@@ -38,7 +38,7 @@ class RecipeAdmin(ModelAdmin):
     @display(description='Общее число добавлений в избранное')
     def added_in_favorites(self, obj):
         """Добавленные в избранное."""
-        return obj.favorites.count()
+        return obj.favorites_count
 
 
 @register(CountOfIngredient)
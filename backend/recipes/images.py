@@ -0,0 +1,184 @@
+"""Обработка изображений рецептов."""
+
+import re
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import Recipe
+from .storage import recipe_images_storage as storage
+from .tasks import enqueue
+
+# Каталог уменьшенных копий до перехода на хранилище по содержимому.
+THUMBNAILS_DIR = 'thumbnails'
+VARIANT_SUFFIX = re.compile(r'-\d+w$')
+# Тег EXIF с ориентацией снимка.
+ORIENTATION = 0x0112
+# Метаданные, которые Pillow кладёт в info: XMP, комментарии JPEG и GIF,
+# IPTC из блока Photoshop.
+METADATA_KEYS = ('xmp', 'comment', 'photoshop')
+# Параметры перекодирования оригинала без потери качества.
+ORIGINAL_OPTIONS = {
+    'JPEG': {'quality': 'keep', 'comment': b''},
+    'PNG': {},
+    'GIF': {'save_all': True, 'comment': b''},
+}
+
+
+def schedule_processing(recipe):
+    """Обработка изображения рецепта в фоне после сохранения."""
+    enqueue(
+        'recipes.images.process_recipe_image', recipe.pk, recipe.image.name
+    )
+
+
+def release_later(names):
+    """Освобождение файлов в фоне после фиксации транзакции."""
+    names = [name for name in names if name]
+    if names:
+        enqueue('recipes.images.release_images', names)
+
+
+def encode(image, image_format, **options):
+    """Изображение в виде файла в памяти без метаданных."""
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def open_image(name):
+    """Проверка и загрузка изображения из хранилища.
+
+    Файл читается в память целиком, чтобы при перезаписи были доступны
+    все кадры анимированного GIF.
+    """
+    with storage.open(name) as file:
+        content = BytesIO(file.read())
+    Image.open(content).verify()
+    content.seek(0)
+    image = Image.open(content)
+    image.load()
+    return image, image.format
+
+
+def has_metadata(image):
+    """Есть ли в изображении метаданные, кроме ориентации и ICC профиля."""
+    return bool(
+        set(image.getexif()) - {ORIENTATION}
+        or any(image.info.get(key) for key in METADATA_KEYS)
+        or getattr(image, 'text', None)
+    )
+
+
+def save_original(name, image, image_format):
+    """Перезапись оригинала без метаданных.
+
+    Из метаданных остаются только ориентация EXIF и ICC профиль. JPEG
+    перекодируется с исходными таблицами квантования (quality='keep'),
+    PNG и GIF (со всеми кадрами) без потерь. Оригинал без метаданных
+    не перезаписывается и остаётся байт в байт таким, как его загрузили.
+    """
+    if not has_metadata(image):
+        return name
+    orientation = image.getexif().get(ORIENTATION)
+    kept = Image.Exif()
+    if orientation:
+        kept[ORIENTATION] = orientation
+    return storage.save(name, encode(
+        image, image_format,
+        exif=kept.tobytes() if kept else b'',
+        icc_profile=image.info.get('icc_profile'),
+        **ORIGINAL_OPTIONS.get(image_format, {}),
+    ))
+
+
+def save_variants(name, image):
+    """Уменьшенные копии изображения для srcset.
+
+    Копии лежат рядом с оригиналом и называются по его имени, поэтому
+    у одинаковых изображений они общие.
+    """
+    path = PurePosixPath(name)
+    image_format = settings.RECIPE_IMAGE_FORMAT
+    extension = image_format.lower()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    width, height = image.size
+    variants = []
+    for variant_width in sorted(settings.RECIPE_IMAGE_WIDTHS):
+        if variant_width >= width:
+            break
+        variant = image.resize(
+            (variant_width, max(1, round(height * variant_width / width))),
+            Image.LANCZOS,
+        )
+        variants.append((variant_width, storage.save_as(
+            str(path.with_name(f'{path.stem}-{variant_width}w.{extension}')),
+            encode(
+                variant, image_format, quality=settings.RECIPE_IMAGE_QUALITY
+            ),
+        )))
+    return variants
+
+
+def owner_prefix(name):
+    """Имя оригинала без расширения, которому принадлежит файл."""
+    path = PurePosixPath(name)
+    stem = VARIANT_SUFFIX.sub('', path.name.split('.')[0])
+    if str(path.parent) in ('.', THUMBNAILS_DIR):
+        return stem
+    return f'{path.parent}/{stem}'
+
+
+def is_referenced(name):
+    """Ссылается ли какой-либо рецепт на файл или его оригинал."""
+    prefix = owner_prefix(name)
+    # Все имена вида «prefix.*» лежат между «prefix.» и «prefix/»,
+    # такое условие в отличие от LIKE использует индекс по image.
+    return Recipe.objects.filter(
+        image__gte=f'{prefix}.', image__lt=f'{prefix}/'
+    ).exists()
+
+
+def release_images(names):
+    """Удаление файлов, на которые больше не ссылается ни один рецепт.
+
+    Недавно сохранённые файлы остаются сборщику мусора: на них может
+    сослаться рецепт из ещё не зафиксированной транзакции.
+    """
+    for name in set(names):
+        if (
+            storage.exists(name)
+            and not storage.is_recent(name)
+            and not is_referenced(name)
+        ):
+            storage.delete(name)
+
+
+def process_recipe_image(recipe_id, name):
+    """Проверка, очистка метаданных и нарезка вариантов изображения.
+
+    Если за время обработки изображение рецепта сменилось, результат
+    отбрасывается: новую версию обработает своя задача.
+    """
+    old_variants = (
+        Recipe.objects.filter(pk=recipe_id, image=name)
+        .values_list('image_variants', flat=True).first()
+    )
+    if old_variants is None:
+        return
+    image, image_format = open_image(name)
+    original = save_original(name, image, image_format)
+    image = ImageOps.exif_transpose(image)
+    variants = save_variants(original, image)
+    variants.append((image.width, original))
+    updated = Recipe.objects.filter(pk=recipe_id, image=name).update(
+        image=original, image_variants=variants
+    )
+    if updated:
+        release_images([name, *(variant for _, variant in old_variants)])
+    else:
+        release_images([original, *(variant for _, variant in variants)])
@@ -0,0 +1,64 @@
+"""Удаление файлов изображений, на которые не ссылаются рецепты."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.images import owner_prefix
+from recipes.models import Recipe
+from recipes.storage import recipe_images_storage as storage
+
+
+class Command(BaseCommand):
+    """Сборка мусора в хранилище изображений рецептов.
+
+    Каталоги первого уровня хранилища обходятся по одному: для каждого
+    загружаются имена его файлов и изображения рецептов из того же
+    каталога, поэтому память не зависит от общего числа файлов.
+    """
+
+    help = (
+        'Удаляет файлы изображений и их уменьшенные копии, на которые '
+        'не ссылается ни один рецепт.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, сколько файлов будет удалено.'
+        )
+
+    def handle(self, *args, **options):
+        """Обход каталогов хранилища."""
+        root = settings.RECIPE_IMAGE_DIR
+        if not storage.exists(root):
+            return
+        removed = freed = 0
+        buckets, _ = storage.listdir(root)
+        for bucket in sorted(buckets):
+            orphans = self.find_orphans(f'{root}/{bucket}')
+            for name in orphans:
+                freed += storage.size(name)
+                if not options['dry_run']:
+                    storage.delete(name)
+            removed += len(orphans)
+        action = 'Найдено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} файлов: {removed}, {freed / 1024 / 1024:.1f} МБ'
+        ))
+
+    def find_orphans(self, bucket):
+        """Файлы каталога, на которые не ссылаются рецепты."""
+        referenced = {
+            owner_prefix(name)
+            for name in Recipe.objects.filter(
+                image__gte=f'{bucket}/', image__lt=f'{bucket}0'
+            ).values_list('image', flat=True).iterator()
+        }
+        _, files = storage.listdir(bucket)
+        return [
+            name
+            for name in (f'{bucket}/{file}' for file in files)
+            if owner_prefix(name) not in referenced
+            and not storage.is_recent(name)
+        ]
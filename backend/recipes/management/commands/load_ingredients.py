@@ -0,0 +1,166 @@
+"""Загрузка справочника ингредиентов."""
+
+import csv
+import gzip
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import Ingredient
+from recipes.search import ingredient_autocomplete
+
+CHUNK_SIZE = 64 * 1024
+FORMATS = ('csv', 'json')
+SEPARATORS = ' \t\r\n,'
+CSV_HEADER = ('name', 'measurement_unit')
+MAX_LENGTH = Ingredient._meta.get_field('name').max_length
+
+
+def open_catalogue(path):
+    """Открытие файла, в том числе сжатого gzip."""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_csv(file):
+    """Строки CSV файла без заголовка."""
+    for row in csv.reader(file):
+        if row and tuple(row) != CSV_HEADER:
+            yield row
+
+
+def read_json(file):
+    """Потоковое чтение JSON массива объектов."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('JSON файл должен содержать массив ингредиентов.')
+    position = 1
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if buffer.startswith(']', position):
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный JSON файл.')
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        if isinstance(item, dict):
+            yield item.get('name'), item.get('measurement_unit')
+        else:
+            yield ()
+
+
+READERS = {'csv': read_csv, 'json': read_json}
+
+
+class Command(BaseCommand):
+    """Пакетная загрузка ингредиентов из CSV или JSON."""
+
+    help = (
+        'Загружает ингредиенты из CSV или JSON файла (в том числе .gz). '
+        'Уже существующие пары (название, единица измерения) пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            'path', nargs='?',
+            default=settings.BASE_DIR.parent / 'data' / 'ingredients.csv',
+            help='Файл со справочником, по умолчанию data/ingredients.csv.'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла, по умолчанию определяется по расширению.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1_000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только подсчитать новые ингредиенты без записи в базу.'
+        )
+
+    def handle(self, *args, **options):
+        """Загрузка файла пакетами."""
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден.')
+        reader = READERS[options['format'] or self.detect_format(path)]
+        self.invalid = 0
+        created, existing, processed = 0, 0, 0
+        started = time.perf_counter()
+        with open_catalogue(path) as file:
+            rows = self.clean(reader(file))
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                processed += len(batch)
+                new = self.sync(batch, options['dry_run'])
+                created += new
+                existing += len(batch) - new
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Обработано строк: {processed}')
+        elapsed = time.perf_counter() - started
+        if created and not options['dry_run']:
+            ingredient_autocomplete.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк: {processed}, новых: {created}, '
+            f'уже в базе: {existing}, некорректных: {self.invalid}, '
+            f'{processed / max(elapsed, 1e-6):.0f} строк/с'
+            + (' (пробный запуск)' if options['dry_run'] else '')
+        ))
+
+    def detect_format(self, path):
+        """Формат по расширению файла."""
+        suffixes = path.suffixes
+        if suffixes and suffixes[-1] == '.gz':
+            suffixes = suffixes[:-1]
+        extension = suffixes[-1].lstrip('.') if suffixes else ''
+        if extension not in FORMATS:
+            raise CommandError(
+                f'Не удалось определить формат {path}, укажите --format.'
+            )
+        return extension
+
+    def clean(self, rows):
+        """Пары (название, единица) с пропуском некорректных строк."""
+        for row in rows:
+            if len(row) != 2 or not all(
+                isinstance(value, str) and 0 < len(value.strip()) <= MAX_LENGTH
+                for value in row
+            ):
+                self.invalid += 1
+                continue
+            yield tuple(value.strip() for value in row)
+
+    def sync(self, batch, dry_run):
+        """Вставка отсутствующих в базе ингредиентов пакета.
+
+        Пары, которые успела вставить параллельная загрузка, пропускает
+        уникальность (название, единица) и ON CONFLICT DO NOTHING.
+        """
+        batch = dict.fromkeys(batch)
+        existing = set(
+            Ingredient.objects.filter(
+                name__in={name for name, _ in batch}
+            ).values_list('name', 'measurement_unit')
+        )
+        new = [key for key in batch if key not in existing]
+        if not dry_run:
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(name=name, measurement_unit=measurement_unit)
+                    for name, measurement_unit in new
+                ),
+                ignore_conflicts=True,
+            )
+        return len(new)
@@ -0,0 +1,41 @@
+"""Обработка изображений ранее загруженных рецептов."""
+
+from django.core.management.base import BaseCommand
+from PIL import UnidentifiedImageError
+
+from recipes.images import process_recipe_image
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    """Нарезка вариантов изображений рецептов, у которых их ещё нет."""
+
+    help = (
+        'Очищает метаданные и создаёт уменьшенные копии изображений '
+        'рецептов без вариантов или, с флагом --all, всех рецептов.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Обработать заново изображения всех рецептов.'
+        )
+
+    def handle(self, *args, **options):
+        """Обработка изображений по очереди в текущем процессе."""
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.filter(image_variants=[])
+        processed = failed = 0
+        for pk, name in recipes.values_list('pk', 'image').iterator():
+            try:
+                process_recipe_image(pk, name)
+            except (OSError, UnidentifiedImageError) as error:
+                failed += 1
+                self.stderr.write(f'Рецепт {pk}, {name}: {error}')
+            else:
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {processed}, с ошибками: {failed}'
+        ))
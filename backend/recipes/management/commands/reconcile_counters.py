@@ -0,0 +1,50 @@
+"""Сверка денормализованных счётчиков."""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from foodgram.counters import actual_count
+from recipes.models import Favorite, Recipe
+from users.models import ShoppingCart, Subscribe, User
+
+# Модель со счётчиком, поле счётчика, модель-источник, поле связи.
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'in_carts_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'subscribers_count', Subscribe, 'author'),
+)
+
+
+class Command(BaseCommand):
+    """Пересчёт счётчиков, разошедшихся с фактическими данными."""
+
+    help = (
+        'Пересчитывает счётчики избранного, списков покупок, рецептов '
+        'и подписчиков или, с флагом --verify, только ищет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Только проверить счётчики без изменений.'
+        )
+
+    def handle(self, *args, **options):
+        """Сверка всех счётчиков."""
+        drifted = 0
+        for model, field, source, key in COUNTERS:
+            actual = actual_count(source, key)
+            stale = model.objects.exclude(**{field: actual})
+            with transaction.atomic():
+                if options['verify']:
+                    count = stale.count()
+                else:
+                    count = stale.update(**{field: actual})
+            drifted += count
+            self.stdout.write(
+                f'{model._meta.label}.{field}: расхождений {count}'
+            )
+        if options['verify'] and drifted:
+            raise CommandError('Счётчики расходятся с данными.')
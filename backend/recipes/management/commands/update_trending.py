@@ -0,0 +1,83 @@
+"""Пересчёт трендовых рецептов."""
+
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from recipes.models import RecipeEvent, TrendingRecipe
+
+WEIGHTS = {
+    RecipeEvent.FAVORITE: 1.0,
+    RecipeEvent.SHOPPING_CART: 2.0,
+}
+
+
+class Command(BaseCommand):
+    """Расчёт рейтинга рецептов по событиям с затуханием по времени."""
+
+    help = (
+        'Пересчитывает таблицу трендовых рецептов по недавним добавлениям '
+        'в избранное и списки покупок. Запускается периодически.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--window-days', type=int, default=settings.TRENDING_WINDOW_DAYS
+        )
+        parser.add_argument(
+            '--half-life-hours', type=float,
+            default=settings.TRENDING_HALF_LIFE_HOURS,
+        )
+        parser.add_argument(
+            '--size', type=int, default=settings.TRENDING_SIZE,
+            help='Количество рецептов в рейтинге.'
+        )
+
+    def handle(self, *args, **options):
+        """Пересчёт рейтинга и удаление устаревших событий."""
+        now = timezone.now()
+        since = now - timedelta(days=options['window_days'])
+        scores = self.scores(since, now, options['half_life_hours'])
+        top = heapq.nlargest(
+            options['size'], scores.items(), key=lambda item: item[1]
+        )
+        with transaction.atomic():
+            TrendingRecipe.objects.all().delete()
+            TrendingRecipe.objects.bulk_create(
+                TrendingRecipe(recipe_id=recipe, score=score)
+                for recipe, score in top
+            )
+        deleted, _ = RecipeEvent.objects.filter(created__lt=since).delete()
+        self.stdout.write(
+            f'Рецептов в рейтинге: {len(top)}, '
+            f'удалено устаревших событий: {deleted}'
+        )
+
+    def scores(self, since, now, half_life_hours):
+        """Рейтинг рецептов: взвешенные события с экспоненциальным затуханием.
+
+        События агрегируются в базе по часам, поэтому объём данных
+        ограничен числом рецептов с активностью за окно, а не событий.
+        """
+        buckets = (
+            RecipeEvent.objects.filter(created__gte=since)
+            .annotate(hour=TruncHour('created'))
+            .values_list('recipe', 'kind', 'hour')
+            .annotate(total=Count('pk'))
+            .order_by()
+        )
+        scores = defaultdict(float)
+        for recipe, kind, hour, total in buckets.iterator():
+            age = (now - hour).total_seconds() / 3600
+            scores[recipe] += (
+                WEIGHTS[kind] * total * 0.5 ** (age / half_life_hours)
+            )
+        return scores
@@ -0,0 +1,101 @@
+"""Менеджеры приложения recipes."""
+
+from django.apps import apps
+from django.db import connection, models, transaction
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+
+from foodgram.counters import change_counter
+from foodgram.links import add_links, remove_links
+
+
+class RecipeQuerySet(models.QuerySet):
+    """Выборки рецептов."""
+
+    def latest_by_authors(self, authors, limit=None):
+        """Последние рецепты каждого из авторов.
+
+        Ограничение на автора считается одним запросом с ROW_NUMBER()
+        OVER (PARTITION BY author_id) вместо запроса на каждого автора.
+        """
+        recipes = self.filter(author__in=authors)
+        if limit is None or not authors:
+            return recipes
+        ranked = recipes.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('author_id'),
+                order_by=F('pk').desc(),
+            )
+        ).order_by().values('pk', 'row_number')
+        sql, params = ranked.query.sql_with_params()
+        quote = connection.ops.quote_name
+        return recipes.filter(pk__in=RawSQL(
+            f'SELECT {quote("id")} FROM ({sql}) {quote("ranked")} '
+            f'WHERE {quote("row_number")} <= %s',
+            (*params, limit),
+        ))
+
+
+def recipes_by_pks(pks):
+    """Выборка рецептов по идентификаторам."""
+    return apps.get_model('recipes', 'Recipe').objects.filter(pk__in=pks)
+
+
+def log_recipe_events(recipes, kind):
+    """События рецептов для расчёта популярности.
+
+    kind — имя константы типа события в RecipeEvent, например FAVORITE.
+    """
+    event_model = apps.get_model('recipes', 'RecipeEvent')
+    event_model.objects.bulk_create(
+        event_model(recipe_id=recipe, kind=getattr(event_model, kind))
+        for recipe in recipes
+    )
+
+
+class UserRecipeManager(models.Manager):
+    """Менеджер связей пользователя с рецептами.
+
+    Рецепты добавляются и удаляются одним запросом без сигналов моделей,
+    поэтому счётчики и события рецептов обновляются здесь же. Атрибуты
+    counter и event задают поле счётчика рецепта и тип события.
+    """
+
+    counter = None
+    event = None
+
+    def add_recipes(self, user, recipes):
+        """Добавление существующих рецептов, которых ещё нет у пользователя."""
+        with transaction.atomic():
+            added = add_links(self.model, 'user', user.pk, 'recipe', recipes)
+            if added:
+                change_counter(recipes_by_pks(added), self.counter, 1)
+                log_recipe_events(added, self.event)
+                self.recipes_added(user, added)
+        return added
+
+    def remove_recipes(self, user, recipes):
+        """Удаление рецептов пользователя."""
+        with transaction.atomic():
+            removed = remove_links(
+                self.model, 'user', user.pk, 'recipe', recipes
+            )
+            if removed:
+                change_counter(recipes_by_pks(removed), self.counter, -1)
+                self.recipes_removed(user, removed)
+        return removed
+
+    def recipes_added(self, user, recipes):
+        """Обработка добавленных рецептов."""
+
+    def recipes_removed(self, user, recipes):
+        """Обработка удалённых рецептов."""
+
+
+class FavoriteManager(UserRecipeManager):
+    """Менеджер избранного."""
+
+    counter = 'favorites_count'
+    event = 'FAVORITE'
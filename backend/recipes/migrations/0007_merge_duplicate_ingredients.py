@@ -0,0 +1,76 @@
+# Generated by Django 3.2.7 on 2026-10-18 04:32
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    """Объединение ингредиентов с одинаковыми названием и единицей.
+
+    Остаётся ингредиент с наименьшим id, ссылки на дубликаты переносятся
+    на него: количества ингредиентов в рецептах и позиции списков покупок.
+    """
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    groups = Ingredient.objects.values('name', 'measurement_unit').annotate(
+        keep=Min('pk'), total=Count('pk')
+    ).filter(total__gt=1).order_by()
+    for group in groups:
+        duplicates = list(Ingredient.objects.filter(
+            name=group['name'], measurement_unit=group['measurement_unit']
+        ).exclude(pk=group['keep']).values_list('pk', flat=True))
+        merge_counts(apps, group['keep'], duplicates)
+        merge_shopping_lists(apps, group['keep'], duplicates)
+        Ingredient.objects.filter(pk__in=duplicates).delete()
+
+
+def merge_counts(apps, keep, duplicates):
+    """Перенос количеств ингредиентов на оставшийся ингредиент."""
+    CountOfIngredient = apps.get_model('recipes', 'CountOfIngredient')
+    Through = apps.get_model('recipes', 'Recipe').ingredients.through
+    for count in CountOfIngredient.objects.filter(ingredient__in=duplicates):
+        target = CountOfIngredient.objects.filter(
+            ingredient=keep, amount=count.amount
+        ).first()
+        if target is None:
+            count.ingredient_id = keep
+            count.save(update_fields=('ingredient',))
+            continue
+        linked = set(Through.objects.filter(
+            countofingredient=target
+        ).values_list('recipe', flat=True))
+        Through.objects.bulk_create(
+            Through(recipe_id=recipe, countofingredient_id=target.pk)
+            for recipe in Through.objects.filter(
+                countofingredient=count
+            ).values_list('recipe', flat=True)
+            if recipe not in linked
+        )
+        count.delete()
+
+
+def merge_shopping_lists(apps, keep, duplicates):
+    """Сложение позиций списков покупок с дубликатами."""
+    ShoppingListItem = apps.get_model('users', 'ShoppingListItem')
+    for item in ShoppingListItem.objects.filter(ingredient__in=duplicates):
+        target = ShoppingListItem.objects.filter(
+            user=item.user_id, ingredient=keep
+        ).first()
+        if target is None:
+            item.ingredient_id = keep
+            item.save(update_fields=('ingredient',))
+            continue
+        target.total += item.total
+        target.save(update_fields=('total',))
+        item.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipe_image_storage'),
+        ('users', '0004_shopping_list_item'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
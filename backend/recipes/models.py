@@ -5,6 +5,9 @@ from django.core.validators import MinValueValidator
 from django.db import models
 from django.urls import reverse
 
+from .managers import FavoriteManager, RecipeQuerySet
+from .storage import recipe_images_storage
+
 MIN_INGREDIENT = 1
 MIN_COOKING_TIME = 1
 
@@ -16,7 +19,7 @@ class Tag(models.Model):
 
     name = models.CharField('Название', max_length=200)
     color = models.CharField('Цвет в HEX', max_length=7)
-    slug = models.SlugField('Идентификатор', max_length=200)
+    slug = models.SlugField('Идентификатор', max_length=200, unique=True)
 
     class Meta:
         """Мета класс тега."""
@@ -45,6 +48,12 @@ class Ingredient(models.Model):
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
         ordering = ('name',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('name', 'measurement_unit'),
+                name='unique_ingredient_name_unit',
+            ),
+        )
 
     def __str__(self):
         """Описание ингредиента."""
@@ -66,7 +75,12 @@ class Recipe(models.Model):
         related_name='recipes',
         verbose_name='Теги'
     )
-    image = models.ImageField('Изображение')
+    image = models.ImageField(
+        'Изображение', storage=recipe_images_storage, db_index=True
+    )
+    image_variants = models.JSONField(
+        'Варианты изображения', default=list, editable=False
+    )
     cooking_time = models.PositiveIntegerField(
         'Время готовки',
         validators=(MinValueValidator(
@@ -81,6 +95,14 @@ class Recipe(models.Model):
         related_name='recipes',
         verbose_name='Автор'
     )
+    favorites_count = models.PositiveIntegerField(
+        'Добавлений в избранное', default=0, editable=False, db_index=True
+    )
+    in_carts_count = models.PositiveIntegerField(
+        'Добавлений в список покупок', default=0, editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         """Мета класс рецепта."""
@@ -88,6 +110,11 @@ class Recipe(models.Model):
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-pk',)
+        indexes = (
+            models.Index(
+                fields=('author', '-id'), name='recipe_author_id_idx'
+            ),
+        )
 
     def __str__(self):
         """Описание рецепта."""
@@ -151,6 +178,8 @@ class Favorite(models.Model):
         verbose_name='Рецепт'
     )
 
+    objects = FavoriteManager()
+
     class Meta:
         """Мета класс избранного."""
 
@@ -162,7 +191,66 @@ class Favorite(models.Model):
                 name='unique_user_recipe',
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('recipe', 'user'), name='favorite_recipe_user_idx'
+            ),
+        )
 
     def __str__(self):
         """Описание избранного."""
         return f'{self.user} -> {self.recipe}'
+
+
+class RecipeEvent(models.Model):
+    """Событие популярности рецепта для расчёта трендов."""
+
+    FAVORITE = 'favorite'
+    SHOPPING_CART = 'shopping_cart'
+    KINDS = (
+        (FAVORITE, 'Добавление в избранное'),
+        (SHOPPING_CART, 'Добавление в список покупок'),
+    )
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='events',
+        verbose_name='Рецепт'
+    )
+    kind = models.CharField('Тип', max_length=20, choices=KINDS)
+    created = models.DateTimeField('Время', auto_now_add=True, db_index=True)
+
+    class Meta:
+        """Мета класс события рецепта."""
+
+        verbose_name = 'Событие рецепта'
+        verbose_name_plural = 'События рецептов'
+
+    def __str__(self):
+        """Описание события."""
+        return f'{self.recipe_id}: {self.kind}'
+
+
+class TrendingRecipe(models.Model):
+    """Рейтинг рецептов по недавней активности."""
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Рецепт'
+    )
+    score = models.FloatField('Рейтинг', db_index=True)
+
+    class Meta:
+        """Мета класс рейтинга рецептов."""
+
+        verbose_name = 'Тренд'
+        verbose_name_plural = 'Тренды'
+        ordering = ('-score',)
+
+    def __str__(self):
+        """Описание рейтинга."""
+        return f'{self.recipe_id}: {self.score:.3f}'
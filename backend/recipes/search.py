@@ -0,0 +1,238 @@
+"""Поиск ингредиентов по названию."""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from foodgram.cache import bump_version, get_version
+
+from .models import Ingredient
+
+# Порог совпадения триграмм, как pg_trgm.similarity_threshold по умолчанию.
+SIMILARITY_THRESHOLD = 0.3
+
+
+def normalize(value):
+    """Ключ поиска: регистр и буква «ё» не учитываются."""
+    return value.casefold().replace('ё', 'е').strip()
+
+
+def trigrams(value):
+    """Множество триграмм строки в том же виде, что строит pg_trgm."""
+    result = set()
+    for word in value.split():
+        padded = f'  {word} '
+        result.update(
+            padded[index:index + 3] for index in range(len(padded) - 2)
+        )
+    return result
+
+
+def grams(value):
+    """Подстроки из трёх символов, для более короткой строки — она сама."""
+    if len(value) < 3:
+        return {value}
+    return {value[index:index + 3] for index in range(len(value) - 2)}
+
+
+def inverted(sets):
+    """Обратный индекс: элемент множества -> позиции множеств с ним."""
+    index = defaultdict(list)
+    for position, items in enumerate(sets):
+        for item in items:
+            index[item].append(position)
+    return dict(index)
+
+
+class IngredientIndex:
+    """Индекс названий ингредиентов в памяти процесса.
+
+    Ключи хранятся отсортированными, поэтому совпадения по началу строки
+    находятся двоичным поиском. Подстроки и опечатки ищутся по обратным
+    индексам подстрок и триграмм: проверяются только ключи, у которых
+    есть общие с запросом подстроки или триграммы.
+    """
+
+    def __init__(self, ingredients):
+        """Построение индекса из строк (id, название, единица измерения)."""
+        entries = sorted(
+            (normalize(name), pk, name, measurement_unit)
+            for pk, name, measurement_unit in ingredients
+        )
+        self.keys = [key for key, _, _, _ in entries]
+        self.rows = [
+            {'id': pk, 'name': name, 'measurement_unit': measurement_unit}
+            for _, pk, name, measurement_unit in entries
+        ]
+        key_trigrams = [trigrams(key) for key in self.keys]
+        self.trigram_counts = [len(items) for items in key_trigrams]
+        self.trigram_positions = inverted(key_trigrams)
+        self.gram_positions = inverted(grams(key) for key in self.keys)
+
+    def __len__(self):
+        """Количество ингредиентов в индексе."""
+        return len(self.keys)
+
+    def prefix_range(self, value):
+        """Границы ключей, начинающихся с value."""
+        start = bisect_left(self.keys, value)
+        end = bisect_left(self.keys, value + '\U0010ffff', start)
+        return start, end
+
+    def substring_positions(self, value):
+        """Позиции ключей, содержащих value, по возрастанию.
+
+        Ключ, содержащий value, содержит и каждую её подстроку из трёх
+        символов, поэтому проверяются ключи самой редкой из них. Для
+        запроса короче трёх символов берутся ключи подстрок, в которые
+        он входит.
+        """
+        if len(value) < 3:
+            candidates = sorted({
+                position
+                for gram, positions in self.gram_positions.items()
+                if value in gram
+                for position in positions
+            })
+        else:
+            candidates = min(
+                (self.gram_positions.get(gram, ()) for gram in grams(value)),
+                key=len,
+            )
+        return [
+            position for position in candidates
+            if value in self.keys[position]
+        ]
+
+    def similar_positions(self, value):
+        """Пары (-сходство, позиция) похожих ключей по убыванию сходства.
+
+        Сходство — доля общих триграмм, как similarity() в pg_trgm. Число
+        общих триграмм считается только для ключей из списков триграмм
+        запроса.
+        """
+        value_trigrams = trigrams(value)
+        shared = Counter()
+        for trigram in value_trigrams:
+            shared.update(self.trigram_positions.get(trigram, ()))
+        similar = []
+        for position, count in shared.items():
+            score = count / (
+                len(value_trigrams) + self.trigram_counts[position] - count
+            )
+            if score >= SIMILARITY_THRESHOLD:
+                similar.append((-score, position))
+        return sorted(similar)
+
+    def positions(self, value, limit=None):
+        """Позиции ключей по убыванию релевантности.
+
+        Сначала идут совпадения по началу названия, затем по подстроке,
+        затем похожие названия по убыванию сходства триграмм.
+        """
+        value = normalize(value)
+        start, end = self.prefix_range(value)
+        found = list(range(start, end))
+        if limit is not None and len(found) >= limit:
+            return found[:limit]
+        substring = [
+            position for position in self.substring_positions(value)
+            if not start <= position < end
+        ]
+        found.extend(substring)
+        if limit is not None and len(found) >= limit:
+            return found[:limit]
+        substring = set(substring)
+        found.extend(
+            position for _, position in self.similar_positions(value)
+            if not start <= position < end and position not in substring
+        )
+        return found[:limit]
+
+    def search(self, value, limit=None):
+        """Идентификаторы ингредиентов по убыванию релевантности."""
+        return [
+            self.rows[position]['id']
+            for position in self.positions(value, limit)
+        ]
+
+    def lookup(self, value, limit=None):
+        """Данные ингредиентов по убыванию релевантности."""
+        return [
+            self.rows[position] for position in self.positions(value, limit)
+        ]
+
+
+class IngredientAutocomplete:
+    """Автодополнение ингредиентов по индексу в памяти процесса.
+
+    Каждый воркер строит индекс один раз. После изменения справочника
+    в общем кеше записывается новая версия ингредиентов, и воркеры
+    перестраивают индекс при следующем обращении. С локальным кешем
+    процесса индекс всё равно устаревает не дольше, чем на
+    INGREDIENT_AUTOCOMPLETE_MAX_AGE секунд.
+    """
+
+    def __init__(self):
+        """Пустой индекс."""
+        self.index = None
+        self.version = None
+        self.built_at = 0
+        self.lock = threading.Lock()
+
+    def is_fresh(self, version):
+        """Соответствует ли индекс версии справочника."""
+        return (
+            self.index is not None
+            and self.version == version
+            and time.monotonic() - self.built_at
+            < settings.INGREDIENT_AUTOCOMPLETE_MAX_AGE
+        )
+
+    def get_index(self):
+        """Актуальный индекс."""
+        version = get_version(Ingredient)
+        if not self.is_fresh(version):
+            with self.lock:
+                if not self.is_fresh(version):
+                    self.build(version)
+        return self.index
+
+    def build(self, version):
+        """Построение индекса по справочнику."""
+        self.index = IngredientIndex(
+            Ingredient.objects.values_list(
+                'pk', 'name', 'measurement_unit'
+            ).iterator()
+        )
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def warm(self):
+        """Построение индекса при старте воркера."""
+        try:
+            self.get_index()
+        except DatabaseError:
+            # База ещё не готова, индекс построится при первом запросе.
+            pass
+
+    def invalidate(self):
+        """Сброс индекса во всех воркерах после фиксации транзакции."""
+        bump_version(Ingredient)
+
+    def search(self, value, limit=None):
+        """Идентификаторы ингредиентов по убыванию релевантности."""
+        return self.get_index().search(value, limit)
+
+    def lookup(self, value, limit=None):
+        """Данные ингредиентов по убыванию релевантности."""
+        if limit is None:
+            limit = settings.INGREDIENT_SEARCH_LIMIT
+        return self.get_index().lookup(value, limit)
+
+
+ingredient_autocomplete = IngredientAutocomplete()
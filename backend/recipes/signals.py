@@ -0,0 +1,96 @@
+"""Signals module."""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from foodgram.cache import bump_version
+from foodgram.counters import change_counter
+from users.models import ShoppingCart, Subscribe, User
+
+from .images import release_later
+from .models import Favorite, Ingredient, Recipe, RecipeEvent, Tag
+
+# Модель-источник: (модель со счётчиком, поле связи, поле счётчика).
+COUNTERS = {
+    Favorite: (Recipe, 'recipe_id', 'favorites_count'),
+    ShoppingCart: (Recipe, 'recipe_id', 'in_carts_count'),
+    Recipe: (User, 'author_id', 'recipes_count'),
+    Subscribe: (User, 'author_id', 'subscribers_count'),
+}
+
+
+@receiver((post_save, post_delete), sender=Tag)
+@receiver((post_save, post_delete), sender=Ingredient)
+def bump_reference_version(sender, **kwargs):
+    """Новая версия справочника для кеша ответов и индекса поиска."""
+    bump_version(sender)
+
+
+def update_counter(instance, delta):
+    """Изменение счётчика объекта, на который ссылается instance."""
+    model, key, field = COUNTERS[type(instance)]
+    pk = getattr(instance, key)
+    if pk is not None:
+        change_counter(model.objects.filter(pk=pk), field, delta)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Subscribe)
+def increment_counter(sender, instance, created, **kwargs):
+    """Увеличение счётчика при создании связи."""
+    if created:
+        update_counter(instance, 1)
+
+
+@receiver(post_save, sender=Favorite)
+def log_favorite(sender, instance, created, **kwargs):
+    """Событие добавления рецепта в избранное."""
+    if created:
+        RecipeEvent.objects.create(
+            recipe_id=instance.recipe_id, kind=RecipeEvent.FAVORITE
+        )
+
+
+@receiver(post_save, sender=ShoppingCart)
+def log_shopping_cart(sender, instance, created, **kwargs):
+    """Событие добавления рецепта в список покупок."""
+    if created:
+        RecipeEvent.objects.create(
+            recipe_id=instance.recipe_id, kind=RecipeEvent.SHOPPING_CART
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Subscribe)
+def decrement_counter(sender, instance, **kwargs):
+    """Уменьшение счётчика при удалении связи."""
+    update_counter(instance, -1)
+
+
+def image_files(image, variants):
+    """Файлы изображения рецепта и его вариантов."""
+    return [image, *(name for _, name in variants)]
+
+
+@receiver(pre_save, sender=Recipe)
+def replace_image(sender, instance, **kwargs):
+    """Сброс вариантов и освобождение прежнего изображения при замене."""
+    if instance.pk is None:
+        return
+    previous = Recipe.objects.filter(pk=instance.pk).values_list(
+        'image', 'image_variants'
+    ).first()
+    if previous is None or previous[0] == instance.image.name:
+        return
+    instance.image_variants = []
+    release_later(image_files(*previous))
+
+
+@receiver(post_delete, sender=Recipe)
+def release_image(sender, instance, **kwargs):
+    """Освобождение изображения удалённого рецепта."""
+    release_later(image_files(instance.image.name, instance.image_variants))
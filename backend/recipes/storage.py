@@ -0,0 +1,66 @@
+"""Хранилище изображений рецептов."""
+
+import hashlib
+import os
+from datetime import timedelta
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, в котором имя файла определяется его содержимым.
+
+    Файл сохраняется как ``<каталог>/<ab>/<sha256><расширение>``, поэтому
+    одинаковые изображения разных рецептов занимают один файл. Повторное
+    сохранение существующего файла только обновляет время его изменения,
+    чтобы сборщик мусора не удалил файл, на который вот-вот сошлётся
+    новый рецепт.
+    """
+
+    def get_content_name(self, name, content):
+        """Имя файла по хешу содержимого."""
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        digest = digest.hexdigest()
+        suffix = PurePosixPath(name).suffix.lower()
+        return (
+            f'{settings.RECIPE_IMAGE_DIR}/{digest[:2]}/{digest}{suffix}'
+        )
+
+    def save(self, name, content, max_length=None):
+        """Сохранение файла под именем по его содержимому."""
+        return self.save_as(
+            self.get_content_name(name, content), content, max_length
+        )
+
+    def save_as(self, name, content, max_length=None):
+        """Сохранение файла под точным именем, если его ещё нет."""
+        if self.exists(name):
+            self.touch(name)
+            return name
+        saved = super().save(name, content, max_length)
+        if saved != name:
+            # Такой же файл успел сохранить параллельный запрос.
+            self.delete(saved)
+        return name
+
+    def touch(self, name):
+        """Обновление времени изменения файла."""
+        os.utime(self.path(name))
+
+    def is_recent(self, name):
+        """Изменялся ли файл в течение MEDIA_GC_GRACE_PERIOD."""
+        return self.get_modified_time(name) > timezone.now() - timedelta(
+            seconds=settings.MEDIA_GC_GRACE_PERIOD
+        )
+
+
+recipe_images_storage = ContentAddressedStorage()
@@ -0,0 +1,60 @@
+"""Фоновые задачи приложения recipes."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def run_task(task, *args):
+    """Выполнение задачи со своим соединением с базой данных."""
+    close_old_connections()
+    try:
+        import_string(task)(*args)
+    except Exception:
+        logger.exception('Ошибка фоновой задачи %s%r', task, args)
+    finally:
+        close_old_connections()
+
+
+class ImmediateBackend:
+    """Выполнение задач сразу в текущем потоке."""
+
+    def submit(self, task, *args):
+        """Выполнение задачи."""
+        import_string(task)(*args)
+
+
+class ThreadPoolBackend:
+    """Очередь задач в пуле потоков процесса."""
+
+    def __init__(self):
+        """Создание пула потоков."""
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.TASK_WORKERS,
+            thread_name_prefix='foodgram-task',
+        )
+
+    def submit(self, task, *args):
+        """Постановка задачи в очередь."""
+        self.executor.submit(run_task, task, *args)
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """Брокер задач из настройки TASK_BACKEND."""
+    return import_string(settings.TASK_BACKEND)()
+
+
+def enqueue(task, *args):
+    """Постановка задачи после фиксации транзакции.
+
+    Задача передаётся по пути к функции и с простыми аргументами, поэтому
+    брокер можно заменить внешней очередью без изменения вызывающего кода.
+    """
+    transaction.on_commit(lambda: get_backend().submit(task, *args))
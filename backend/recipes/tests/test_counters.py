@@ -0,0 +1,81 @@
+"""Тесты денормализованных счётчиков."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from recipes.models import Favorite, Recipe
+from users.models import ShoppingCart, Subscribe, User
+
+
+class CountersTest(TestCase):
+    """Счётчики совпадают с фактическим числом связей."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Автор с рецептами и пользователь."""
+        cls.author = User.objects.create_user(
+            'author', 'author@mail.ru', 'password'
+        )
+        cls.user = User.objects.create_user('user', 'user@mail.ru', 'password')
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {number}', text='Текст', image='recipe.jpg',
+                cooking_time=10, author=cls.author,
+            )
+            for number in range(3)
+        ]
+
+    def assert_counters(self, **expected):
+        """Проверка счётчиков и их сверка с фактическими данными."""
+        recipe = Recipe.objects.get(pk=self.recipes[0].pk)
+        author = User.objects.get(pk=self.author.pk)
+        actual = {
+            'favorites': recipe.favorites_count,
+            'carts': recipe.in_carts_count,
+            'recipes': author.recipes_count,
+            'subscribers': author.subscribers_count,
+        }
+        self.assertEqual(actual, {**actual, **expected})
+        call_command('reconcile_counters', '--verify', stdout=StringIO())
+
+    def test_recipes_count(self):
+        """Создание и удаление рецептов автора."""
+        self.assert_counters(recipes=3)
+        self.recipes[2].delete()
+        self.assert_counters(recipes=2)
+
+    def test_subscribers_count(self):
+        """Подписка и отписка."""
+        subscribe = Subscribe.objects.create(
+            user=self.user, author=self.author
+        )
+        self.assert_counters(subscribers=1)
+        subscribe.delete()
+        self.assert_counters(subscribers=0)
+
+    def test_manager_links(self):
+        """Добавление и удаление рецептов менеджерами связей."""
+        recipes = [recipe.pk for recipe in self.recipes]
+        for manager in (Favorite.objects, ShoppingCart.objects):
+            self.assertEqual(manager.add_recipes(self.user, recipes), recipes)
+            self.assertEqual(manager.add_recipes(self.user, recipes), [])
+        self.assert_counters(favorites=1, carts=1)
+        for manager in (Favorite.objects, ShoppingCart.objects):
+            self.assertEqual(
+                manager.remove_recipes(self.user, recipes[:1]), recipes[:1]
+            )
+            self.assertEqual(
+                manager.remove_recipes(self.user, recipes[:1]), []
+            )
+        self.assert_counters(favorites=0, carts=0)
+
+    def test_model_signals(self):
+        """Создание и удаление связей через модели."""
+        Favorite.objects.create(user=self.user, recipe=self.recipes[0])
+        ShoppingCart.objects.create(user=self.user, recipe=self.recipes[0])
+        self.assert_counters(favorites=1, carts=1)
+        Favorite.objects.filter(user=self.user).delete()
+        self.user.delete()
+        self.assert_counters(favorites=0, carts=0)
@@ -0,0 +1,138 @@
+"""Тесты обработки оригиналов изображений."""
+
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image, ImageChops
+from PIL.PngImagePlugin import PngInfo
+
+from recipes.images import ORIENTATION, open_image, save_original
+from recipes.storage import recipe_images_storage as storage
+
+# Теги EXIF с производителем камеры и ссылкой на GPS.
+MAKE = 0x010F
+GPS_INFO = 0x8825
+# Значение, которое записывается во все метаданные тестовых изображений.
+SECRET = b'secret-location'
+
+
+class SaveOriginalTest(SimpleTestCase):
+    """Оригинал перезаписывается только ради удаления метаданных."""
+
+    def setUp(self):
+        """Временный каталог медиафайлов."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def upload(self, image_format, frames=1, **options):
+        """Загрузка тестового изображения в хранилище."""
+        buffer = BytesIO()
+        images = [
+            Image.new('RGB', (40, 20), color)
+            for color in ('orange', 'green', 'blue')[:frames]
+        ]
+        images[0].save(
+            buffer, format=image_format, save_all=frames > 1,
+            append_images=images[1:], **options
+        )
+        name = storage.save(
+            f'upload.{image_format.lower()}', ContentFile(buffer.getvalue())
+        )
+        return name, buffer.getvalue()
+
+    def process(self, name):
+        """Имя и содержимое оригинала после обработки."""
+        image, image_format = open_image(name)
+        original = save_original(name, image, image_format)
+        with storage.open(original) as file:
+            return original, file.read()
+
+    def exif(self, orientation=None):
+        """EXIF с производителем камеры и координатами."""
+        exif = Image.Exif()
+        exif[MAKE] = SECRET.decode()
+        exif.get_ifd(GPS_INFO)[1] = SECRET.decode()
+        if orientation:
+            exif[ORIENTATION] = orientation
+        return exif.tobytes()
+
+    def assert_stripped(self, name, content):
+        """Оригинал перезаписан без метаданных, а затем не меняется."""
+        original, processed = self.process(name)
+        self.assertNotEqual(original, name)
+        self.assertNotIn(SECRET, processed)
+        self.assertEqual(self.process(original), (original, processed))
+        with Image.open(BytesIO(processed)) as image:
+            self.assertEqual(set(image.getexif()) - {ORIENTATION}, set())
+            self.assertFalse(getattr(image, 'text', None))
+            self.assertFalse(
+                {'xmp', 'comment', 'photoshop'} & set(image.info)
+            )
+            with Image.open(BytesIO(content)) as uploaded:
+                self.assertEqual(
+                    getattr(image, 'n_frames', 1),
+                    getattr(uploaded, 'n_frames', 1),
+                )
+                if image.format != 'JPEG':
+                    self.assertIsNone(ImageChops.difference(
+                        image.convert('RGB'), uploaded.convert('RGB')
+                    ).getbbox())
+        return processed
+
+    def test_unchanged(self):
+        """PNG, GIF и JPEG без метаданных остаются байт в байт."""
+        uploads = [
+            self.upload('PNG'),
+            self.upload('GIF'),
+            self.upload('GIF', frames=3),
+            self.upload('JPEG', quality=70),
+        ]
+        for name, content in uploads:
+            with self.subTest(name=name):
+                self.assertEqual(self.process(name), (name, content))
+
+    def test_jpeg_exif(self):
+        """Из EXIF JPEG остаётся ориентация, квантование не меняется."""
+        name, content = self.upload(
+            'JPEG', quality=70, exif=self.exif(orientation=6)
+        )
+        processed = self.assert_stripped(name, content)
+        with Image.open(BytesIO(processed)) as image:
+            self.assertEqual(dict(image.getexif()), {ORIENTATION: 6})
+            self.assertEqual(
+                image.quantization, Image.open(BytesIO(content)).quantization
+            )
+
+    def test_jpeg_xmp_and_comment(self):
+        """XMP и комментарий JPEG удаляются."""
+        uploads = [
+            self.upload('JPEG', xmp=b'<x:xmpmeta>' + SECRET + b'</x:xmpmeta>'),
+            self.upload('JPEG', comment=SECRET),
+        ]
+        for name, content in uploads:
+            with self.subTest(name=name):
+                self.assert_stripped(name, content)
+
+    def test_png(self):
+        """Блоки eXIf и текстовые блоки PNG удаляются без потери пикселей."""
+        text = PngInfo()
+        text.add_text('Comment', SECRET.decode())
+        text.add_itxt('Location', SECRET.decode(), zip=True)
+        uploads = [
+            self.upload('PNG', exif=self.exif()),
+            self.upload('PNG', pnginfo=text),
+        ]
+        for name, content in uploads:
+            with self.subTest(name=name):
+                self.assert_stripped(name, content)
+
+    def test_gif_comment(self):
+        """Комментарий GIF удаляется, кадры сохраняются."""
+        name, content = self.upload('GIF', frames=3, comment=SECRET)
+        self.assert_stripped(name, content)
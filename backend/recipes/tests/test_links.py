@@ -0,0 +1,67 @@
+"""Тесты добавления и удаления связей одним запросом."""
+
+from unittest import mock
+
+from django.test import TestCase
+
+from foodgram.links import add_links, remove_links
+from recipes.models import Favorite, Recipe
+from users.models import User
+
+
+class LinksTest(TestCase):
+    """Связи пользователя с рецептами через RETURNING и без него."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Пользователь и рецепты."""
+        cls.user = User.objects.create_user('user', 'user@mail.ru', 'password')
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {number}', text='Текст', image='recipe.jpg',
+                cooking_time=10, author=cls.user,
+            ).pk
+            for number in range(3)
+        ]
+        cls.missing = max(cls.recipes) + 1
+
+    def favorites(self):
+        """Рецепты в избранном пользователя."""
+        return set(Favorite.objects.filter(user=self.user).values_list(
+            'recipe', flat=True
+        ))
+
+    def add(self, recipes):
+        """Добавление рецептов в избранное."""
+        return set(
+            add_links(Favorite, 'user', self.user.pk, 'recipe', recipes)
+        )
+
+    def remove(self, recipes):
+        """Удаление рецептов из избранного."""
+        return set(
+            remove_links(Favorite, 'user', self.user.pk, 'recipe', recipes)
+        )
+
+    def check_links(self):
+        """Добавляются и удаляются только изменившиеся связи."""
+        first, second, third = self.recipes
+        self.assertEqual(self.add([]), set())
+        self.assertEqual(self.add([first, self.missing]), {first})
+        self.assertEqual(self.add([first, second]), {second})
+        self.assertEqual(self.favorites(), {first, second})
+        self.assertEqual(self.remove([]), set())
+        self.assertEqual(self.remove([second, third, self.missing]), {second})
+        self.assertEqual(self.remove([second]), set())
+        self.assertEqual(self.favorites(), {first})
+
+    def test_returning(self):
+        """INSERT и DELETE с RETURNING."""
+        self.check_links()
+
+    def test_without_returning(self):
+        """Запасной путь для баз без RETURNING."""
+        with mock.patch(
+            'foodgram.links.supports_returning', return_value=False
+        ):
+            self.check_links()
@@ -0,0 +1,49 @@
+"""Тесты загрузки справочника ингредиентов."""
+
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from recipes.models import Ingredient
+
+
+class LoadIngredientsTest(TestCase):
+    """Загрузка без дубликатов пар (название, единица)."""
+
+    def setUp(self):
+        """Файл справочника во временном каталоге."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / 'ingredients.csv'
+        self.path.write_text(
+            'name,measurement_unit\n'
+            'Мука,г\nМука,г\nМука,кг\nСоль,г\n,г\n',
+            encoding='utf-8',
+        )
+
+    def load(self):
+        """Вывод команды загрузки."""
+        stdout = StringIO()
+        call_command('load_ingredients', str(self.path), stdout=stdout)
+        return stdout.getvalue()
+
+    def test_load_twice(self):
+        """Повторная загрузка ничего не добавляет."""
+        Ingredient.objects.create(name='Соль', measurement_unit='г')
+        self.assertIn('новых: 2, уже в базе: 2, некорректных: 1', self.load())
+        self.assertIn('новых: 0, уже в базе: 4', self.load())
+        self.assertEqual(
+            set(Ingredient.objects.values_list('name', 'measurement_unit')),
+            {('Мука', 'г'), ('Мука', 'кг'), ('Соль', 'г')},
+        )
+
+    def test_unique(self):
+        """База не допускает одинаковые пары (название, единица)."""
+        Ingredient.objects.create(name='Мука', measurement_unit='г')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Ingredient.objects.create(name='Мука', measurement_unit='г')
@@ -0,0 +1,44 @@
+"""Тесты индекса поиска ингредиентов."""
+
+from django.test import SimpleTestCase
+
+from recipes.search import IngredientIndex
+
+NAMES = (
+    'Мука пшеничная', 'Мука ржаная', 'Ёжевика', 'Сахар', 'Сахарная пудра',
+    'Рисовая мука', 'Мускатный орех', 'Соус соевый', 'Ел', 'Ель',
+)
+
+
+class IngredientIndexTest(SimpleTestCase):
+    """Порядок и состав результатов поиска."""
+
+    index = IngredientIndex(
+        (number, name, 'г') for number, name in enumerate(NAMES)
+    )
+
+    def names(self, value, limit=None):
+        """Названия найденных ингредиентов."""
+        return [row['name'] for row in self.index.lookup(value, limit)]
+
+    def test_prefix_then_substring(self):
+        """Совпадения по началу идут раньше совпадений по подстроке."""
+        self.assertEqual(
+            self.names('мук'),
+            ['Мука пшеничная', 'Мука ржаная', 'Рисовая мука'],
+        )
+
+    def test_similar(self):
+        """Название с опечаткой находится по триграммам."""
+        self.assertEqual(self.names('сахр'), ['Сахар'])
+        self.assertEqual(self.names('соус соевй')[0], 'Соус соевый')
+
+    def test_short_and_normalized(self):
+        """Короткие запросы, регистр и буква «ё»."""
+        self.assertEqual(self.names('ЕЖ'), ['Ёжевика'])
+        self.assertEqual(self.names('ел'), ['Ел', 'Ель'])
+        self.assertEqual(self.names('я м', limit=1), ['Рисовая мука'])
+
+    def test_limit(self):
+        """Результатов не больше limit."""
+        self.assertEqual(len(self.names('а', limit=2)), 2)
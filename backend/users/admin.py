@@ -1,8 +1,7 @@
 """Админ панель."""
 
-from django.contrib.admin import ModelAdmin, display, register
+from django.contrib.admin import ModelAdmin, register
 from django.contrib.auth.admin import UserAdmin
-from django.db.models import Count, Sum
 
 from .forms import CustomUserChangeForm, CustomUserCreationForm
 from .models import ShoppingCart, Subscribe, User
@@ -22,7 +21,9 @@ class UserAdmin(UserAdmin):
         'first_name',
         'last_name',
         'is_blocked',
-        'is_superuser'
+        'is_superuser',
+        'recipes_count',
+        'subscribers_count',
     )
     list_filter = (
         'email',
@@ -73,20 +74,21 @@ class SubscribeAdmin(ModelAdmin):
 class ShoppingCartAdmin(ModelAdmin):
     """Список покупок админка."""
 
-    list_display = ('user', 'count_ingredients')
-    readonly_fields = ('count_ingredients',)
+    list_display = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
     empty_value_display = '< Пусто >'
 
+    def get_readonly_fields(self, request, obj=None):
+        """Запись списка покупок можно добавить или удалить, но не изменить.
+
+        Итоги списка покупок пересчитываются при создании и удалении записи.
+        """
+        if obj is None:
+            return self.readonly_fields
+        return ('user', 'recipe')
+
     class Meta:
         """Мета класс списка покупок."""
 
         verbose_name = 'Список покупок'
         verbose_name_plural = 'Списки покупок'
-
-    @display(description='Количество ингредиентов')
-    def count_ingredients(self, obj):
-        """Подсчёт ингредиентов."""
-        return (
-            obj.recipes.all().annotate(count_ingredients=Count('ingredients'))
-            .aggregate(total=Sum('count_ingredients'))['total']
-        )
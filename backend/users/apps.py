@@ -11,4 +11,5 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
 
     def ready(self):
-        """Чтение."""
+        """Подключение сигналов."""
+        from . import signals  # noqa: F401
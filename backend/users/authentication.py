@@ -0,0 +1,117 @@
+"""Аутентификация по токену."""
+
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from foodgram.cache import bump_version, get_version, is_shared
+
+from .models import User
+
+# Хеш пароля в кеш не попадает и при обращении загружается из базы.
+SNAPSHOT_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname != 'password'
+)
+
+
+def token_digest(key):
+    """Хеш токена, под которым он хранится в кеше."""
+    return sha1(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    """Сброс закешированного пользователя токена во всех воркерах."""
+    bump_version(Token, token_digest(key))
+
+
+class TokenCache:
+    """Ограниченный LRU кеш токенов процесса с временем жизни записей."""
+
+    def __init__(self):
+        """Пустой кеш."""
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, digest, version):
+        """Снимок пользователя, если запись свежая и версия совпадает."""
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is None:
+                return None
+            snapshot, entry_version, expires_at = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self.entries[digest]
+                return None
+            self.entries.move_to_end(digest)
+            return snapshot
+
+    def set(self, digest, version, snapshot):
+        """Запись снимка пользователя с вытеснением самых старых записей."""
+        expires_at = time.monotonic() + settings.AUTH_TOKEN_CACHE_TIMEOUT
+        with self.lock:
+            self.entries[digest] = (snapshot, version, expires_at)
+            self.entries.move_to_end(digest)
+            while len(self.entries) > settings.AUTH_TOKEN_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Аутентификация по токену без запроса к базе на каждый запрос.
+
+    Снимок полей пользователя хранится в кеше процесса, а с
+    AUTH_TOKEN_CACHE_SHARED и в общем кеше Django. Запись действительна,
+    пока не сменилась версия токена: её меняют выход из аккаунта,
+    блокировка и смена пароля. Без общего кеша другие воркеры не увидят
+    смену версии, поэтому токен и пользователь каждый раз читаются из базы.
+    """
+
+    def authenticate_credentials(self, key):
+        """Пользователь по токену из кеша или из базы данных."""
+        user = self.cached_user(key) if is_shared() else self.load_user(key)
+        if not user.is_active or user.is_blocked:
+            raise AuthenticationFailed('Аккаунт заблокирован')
+        return user, None
+
+    def cached_user(self, key):
+        """Пользователь из снимка в кеше процесса."""
+        digest = token_digest(key)
+        version = get_version(Token, digest)
+        snapshot = token_cache.get(digest, version)
+        if snapshot is None:
+            snapshot = self.load_snapshot(key, digest, version)
+            token_cache.set(digest, version, snapshot)
+        return User.from_db(None, SNAPSHOT_FIELDS, snapshot)
+
+    def load_user(self, key):
+        """Пользователь токена из базы данных."""
+        try:
+            return Token.objects.select_related('user').get(key=key).user
+        except Token.DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.'))
+
+    def load_snapshot(self, key, digest, version):
+        """Снимок пользователя из общего кеша или из базы данных."""
+        shared_key = f'auth:token:{digest}:{version}'
+        if settings.AUTH_TOKEN_CACHE_SHARED:
+            snapshot = cache.get(shared_key)
+            if snapshot is not None:
+                return snapshot
+        user = self.load_user(key)
+        snapshot = tuple(getattr(user, name) for name in SNAPSHOT_FIELDS)
+        if settings.AUTH_TOKEN_CACHE_SHARED:
+            cache.set(
+                shared_key, snapshot, timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT
+            )
+        return snapshot
@@ -0,0 +1 @@
+"""Команды управления приложения users."""
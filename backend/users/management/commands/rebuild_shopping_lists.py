@@ -0,0 +1,61 @@
+"""Пересчёт материализованных списков покупок."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import ShoppingListItem, User
+
+
+class Command(BaseCommand):
+    """Пакетная проверка и пересчёт списков покупок."""
+
+    help = (
+        'Пересчитывает материализованные списки покупок пользователей '
+        'или, с флагом --verify, только проверяет их расхождение.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Только проверить списки покупок без изменений.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1_000)
+        parser.add_argument(
+            '--user', type=int, action='append', dest='users',
+            help='Обработать только указанных пользователей.'
+        )
+
+    def handle(self, *args, **options):
+        """Обработка пользователей пакетами."""
+        users = User.objects.order_by('pk').values_list('pk', flat=True)
+        if options['users']:
+            users = users.filter(pk__in=options['users'])
+        batch_size = options['batch_size']
+        processed, drifted = 0, 0
+        last = None
+        while True:
+            batch = users if last is None else users.filter(pk__gt=last)
+            batch = list(batch[:batch_size])
+            if not batch:
+                break
+            last = batch[-1]
+            processed += len(batch)
+            stale = self.stale_users(batch)
+            drifted += len(stale)
+            if stale and not options['verify']:
+                ShoppingListItem.objects.rebuild(stale)
+        self.stdout.write(
+            f'Проверено пользователей: {processed}, '
+            f'с расхождениями: {drifted}'
+        )
+        if options['verify'] and drifted:
+            raise CommandError('Списки покупок расходятся с корзинами.')
+
+    def stale_users(self, users):
+        """Пользователи, чей список покупок расходится с корзиной."""
+        expected = ShoppingListItem.objects.expected(users)
+        actual = ShoppingListItem.objects.actual(users)
+        return sorted({
+            key[0] for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        })
@@ -1,7 +1,16 @@
 """User manager."""
 
+from collections import Counter
+
+from django.apps import apps
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Greatest
+
+from foodgram.links import supports_upsert
+from recipes.managers import UserRecipeManager
 
 
 class UserManager(BaseUserManager):
@@ -28,3 +37,213 @@ class UserManager(BaseUserManager):
                 'Суперпользователь должен иметь is_superuser=True!'
             )
         return self.create_user(username, email, password, **extra_fields)
+
+
+class ShoppingCartManager(UserRecipeManager):
+    """Менеджер списков покупок.
+
+    Вместе с рецептами изменяются итоги по ингредиентам.
+    """
+
+    counter = 'in_carts_count'
+    event = 'SHOPPING_CART'
+
+    def recipes_added(self, user, recipes):
+        """Добавление ингредиентов в список покупок."""
+        apps.get_model('users', 'ShoppingListItem').objects.add_recipes(
+            user.pk, recipes
+        )
+
+    def recipes_removed(self, user, recipes):
+        """Вычитание ингредиентов из списка покупок."""
+        apps.get_model('users', 'ShoppingListItem').objects.remove_recipes(
+            user.pk, recipes
+        )
+
+
+class ShoppingListItemManager(models.Manager):
+    """Менеджер материализованного списка покупок.
+
+    Итоги меняются вместе с записями списка покупок и ингредиентами
+    рецептов: менеджером ShoppingCart и сигналами моделей.
+    """
+
+    @staticmethod
+    def recipe_amounts(recipes, sign=1):
+        """Количество каждого ингредиента в рецептах."""
+        through = apps.get_model('recipes', 'Recipe').ingredients.through
+        amounts = Counter()
+        for ingredient, amount in through.objects.filter(
+            recipe__in=recipes
+        ).values_list('countofingredient__ingredient',
+                      'countofingredient__amount'):
+            amounts[ingredient] += sign * amount
+        return amounts
+
+    @staticmethod
+    def count_amounts(counts, sign=1):
+        """Количество каждого ингредиента в записях CountOfIngredient."""
+        model = apps.get_model('recipes', 'CountOfIngredient')
+        amounts = Counter()
+        for ingredient, amount in model.objects.filter(
+            pk__in=counts
+        ).values_list('ingredient', 'amount'):
+            amounts[ingredient] += sign * amount
+        return amounts
+
+    @staticmethod
+    def cart_users(recipe):
+        """Пользователи, у которых рецепт в списке покупок."""
+        return apps.get_model('users', 'ShoppingCart').objects.filter(
+            recipe=recipe
+        ).values_list('user', flat=True)
+
+    @staticmethod
+    def recipe_totals(recipes):
+        """Выборка количества каждого ингредиента в рецептах."""
+        through = apps.get_model('recipes', 'Recipe').ingredients.through
+        return through.objects.filter(recipe__in=recipes).values(
+            ingredient=F('countofingredient__ingredient')
+        ).annotate(total=Sum('countofingredient__amount')).order_by()
+
+    def add_recipes(self, user, recipes):
+        """Добавление ингредиентов рецептов в список покупок user.
+
+        Итоги прибавляются одним запросом INSERT ... SELECT ... GROUP BY
+        ... ON CONFLICT DO UPDATE.
+        """
+        recipes = list(recipes)
+        connection = connections[self.db]
+        if not supports_upsert(connection):
+            self.apply_delta((user,), self.recipe_amounts(recipes))
+            return
+        if not recipes:
+            return
+        meta = self.model._meta
+        quote = connection.ops.quote_name
+        table = quote(meta.db_table)
+        user_column = quote(meta.get_field('user').column)
+        ingredient_column = quote(meta.get_field('ingredient').column)
+        total_column = quote(meta.get_field('total').column)
+        sql, params = self.recipe_totals(recipes).filter(
+            total__gt=0
+        ).query.sql_with_params()
+        # WHERE нужен SQLite: без него ON CONFLICT после FROM разбирается
+        # как условие соединения.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} '
+                f'({user_column}, {ingredient_column}, {total_column}) '
+                f'SELECT %s, {quote("ingredient")}, {quote("total")} '
+                f'FROM ({sql}) {quote("totals")} WHERE 1 = 1 '
+                f'ON CONFLICT ({user_column}, {ingredient_column}) '
+                f'DO UPDATE SET {total_column} = '
+                f'{table}.{total_column} + excluded.{total_column}',
+                (user, *params),
+            )
+
+    def remove_recipes(self, user, recipes):
+        """Вычитание ингредиентов рецептов из списка покупок user.
+
+        Итоги уменьшаются одним запросом UPDATE, но не ниже нуля, затем
+        обнулившиеся позиции удаляются.
+        """
+        recipes = list(recipes)
+        if not recipes:
+            return
+        totals = self.recipe_totals(recipes)
+        self.filter(
+            user=user,
+            ingredient__in=totals.values('ingredient'),
+        ).update(total=Greatest(F('total') - Subquery(
+            totals.filter(
+                countofingredient__ingredient=OuterRef('ingredient')
+            ).values('total')
+        ), 0))
+        self.filter(user=user, total=0).delete()
+
+    def change_recipe(self, recipe, counts, sign=1):
+        """Добавление или вычитание ингредиентов рецепта.
+
+        Меняются списки покупок всех пользователей, у которых рецепт
+        в списке; counts — записи CountOfIngredient рецепта.
+        """
+        users = list(self.cart_users(recipe))
+        if users:
+            self.apply_delta(users, self.count_amounts(counts, sign))
+
+    def apply_delta(self, users, delta):
+        """Изменение итогов по ингредиентам в списках покупок."""
+        delta = {
+            ingredient: amount for ingredient, amount in delta.items()
+            if amount
+        }
+        users = list(users)
+        if not delta or not users:
+            return
+        try:
+            with transaction.atomic():
+                self._apply_delta(users, delta)
+        except IntegrityError:
+            # Параллельный запрос успел создать ту же позицию.
+            self.rebuild(users)
+
+    def _apply_delta(self, users, delta):
+        """Изменение итогов внутри транзакции."""
+        items = {
+            (item.user_id, item.ingredient_id): item
+            for item in self.select_for_update().filter(
+                user__in=users, ingredient__in=delta
+            )
+        }
+        created, changed, removed = [], [], []
+        for user in users:
+            for ingredient, amount in delta.items():
+                item = items.get((user, ingredient))
+                if item is None:
+                    created.append(self.model(
+                        user_id=user, ingredient_id=ingredient, total=amount
+                    ))
+                    continue
+                item.total += amount
+                if item.total > 0:
+                    changed.append(item)
+                else:
+                    removed.append(item.pk)
+        self.filter(pk__in=removed).delete()
+        self.bulk_update(changed, ('total',))
+        self.bulk_create(item for item in created if item.total > 0)
+
+    def expected(self, users):
+        """Итоги по ингредиентам, вычисленные из списков покупок."""
+        cart = apps.get_model('users', 'ShoppingCart')
+        return {
+            (user, ingredient): total
+            for user, ingredient, total in cart.objects.filter(
+                user__in=users,
+                recipe__ingredients__isnull=False,
+            ).values_list(
+                'user', 'recipe__ingredients__ingredient'
+            ).annotate(
+                total=Sum('recipe__ingredients__amount')
+            ).order_by()
+        }
+
+    def actual(self, users):
+        """Материализованные итоги по ингредиентам."""
+        return {
+            (user, ingredient): total
+            for user, ingredient, total in self.filter(
+                user__in=users
+            ).values_list('user', 'ingredient', 'total')
+        }
+
+    def rebuild(self, users):
+        """Полный пересчёт списков покупок пользователей."""
+        users = list(users)
+        with transaction.atomic():
+            self.filter(user__in=users).delete()
+            self.bulk_create(
+                self.model(user_id=user, ingredient_id=ingredient, total=total)
+                for (user, ingredient), total in self.expected(users).items()
+            )
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.7 on 2026-10-18 03:09
+
+from django.db import migrations, models
+
+from foodgram.counters import actual_count
+
+
+def fill_counters(apps, schema_editor):
+    """Заполнение счётчиков по существующим данным."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Favorite = apps.get_model('recipes', 'Favorite')
+    User = apps.get_model('users', 'User')
+    Subscribe = apps.get_model('users', 'Subscribe')
+    ShoppingCart = apps.get_model('users', 'ShoppingCart')
+    counters = (
+        (Recipe, 'favorites_count', Favorite, 'recipe'),
+        (Recipe, 'in_carts_count', ShoppingCart.recipes.through, 'recipe'),
+        (User, 'recipes_count', Recipe, 'author'),
+        (User, 'subscribers_count', Subscribe, 'author'),
+    )
+    for model, field, source, key in counters:
+        model.objects.update(**{field: actual_count(source, key)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_recipe_counters'),
+        ('users', '0004_shopping_list_item'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Рецептов'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='subscribers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Подписчиков'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
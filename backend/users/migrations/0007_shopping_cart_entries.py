@@ -0,0 +1,97 @@
+# Generated by Django 3.2.7 on 2026-10-18 04:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def copy_cart_recipes(apps, schema_editor):
+    """Перенос рецептов из списков покупок в записи (user, recipe)."""
+    ShoppingCart = apps.get_model('users', 'ShoppingCart')
+    ShoppingCartEntry = apps.get_model('users', 'ShoppingCartEntry')
+    links = ShoppingCart.recipes.through.objects.values_list(
+        'shoppingcart__user', 'recipe'
+    ).order_by().iterator(chunk_size=BATCH_SIZE)
+    ShoppingCartEntry.objects.bulk_create(
+        (
+            ShoppingCartEntry(user_id=user, recipe_id=recipe)
+            for user, recipe in links
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def copy_cart_entries(apps, schema_editor):
+    """Обратный перенос: список покупок каждому пользователю."""
+    User = apps.get_model('users', 'User')
+    ShoppingCart = apps.get_model('users', 'ShoppingCart')
+    ShoppingCartEntry = apps.get_model('users', 'ShoppingCartEntry')
+    ShoppingCart.objects.bulk_create(
+        (
+            ShoppingCart(user_id=user)
+            for user in User.objects.values_list('pk', flat=True).iterator()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    carts = dict(ShoppingCart.objects.values_list('user_id', 'pk'))
+    through = ShoppingCart.recipes.through
+    through.objects.bulk_create(
+        (
+            through(shoppingcart_id=carts[user], recipe_id=recipe)
+            for user, recipe in ShoppingCartEntry.objects.values_list(
+                'user_id', 'recipe_id'
+            ).iterator(chunk_size=BATCH_SIZE)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '__first__'),
+        ('users', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingCartEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+        ),
+        migrations.RunPython(copy_cart_recipes, copy_cart_entries),
+        migrations.DeleteModel(
+            name='ShoppingCart',
+        ),
+        migrations.RenameModel(
+            old_name='ShoppingCartEntry',
+            new_name='ShoppingCart',
+        ),
+        migrations.AlterModelOptions(
+            name='shoppingcart',
+            options={'verbose_name': 'Рецепт в списке покупок', 'verbose_name_plural': 'Списки покупок'},
+        ),
+        migrations.AlterField(
+            model_name='shoppingcart',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='in_shopping_cart', to='recipes.recipe', verbose_name='Рецепт'),
+        ),
+        migrations.AlterField(
+            model_name='shoppingcart',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_cart', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddConstraint(
+            model_name='shoppingcart',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_shopping_cart'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingcart',
+            index=models.Index(fields=['recipe', 'user'], name='shopping_cart_recipe_user_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.7 on 2026-10-18 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_shopping_cart_entries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('user', 'user'), ('admin', 'admin')], default='user', max_length=30, verbose_name='Роль'),
+        ),
+    ]
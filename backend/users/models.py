@@ -3,7 +3,7 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
 
-from .managers import UserManager
+from .managers import ShoppingCartManager, ShoppingListItemManager, UserManager
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -26,6 +26,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     role = models.CharField(
         'Роль', max_length=30, choices=USER_ROLE, default='user'
     )
+    recipes_count = models.PositiveIntegerField(
+        'Рецептов', default=0, editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        'Подписчиков', default=0, editable=False
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
@@ -76,6 +82,11 @@ class Subscribe(models.Model):
                 name='unique_subscribe',
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('author', 'user'), name='subscribe_author_user_idx'
+            ),
+        )
 
     def __str__(self):
         """Описание класса подписки."""
@@ -83,26 +94,76 @@ class Subscribe(models.Model):
 
 
 class ShoppingCart(models.Model):
-    """Модель списка покупок."""
+    """Модель рецепта в списке покупок."""
 
-    user = models.OneToOneField(
+    user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='shopping_cart',
         verbose_name='Пользователь',
     )
-    recipes = models.ManyToManyField(
+    recipe = models.ForeignKey(
         'recipes.Recipe',
+        on_delete=models.CASCADE,
         related_name='in_shopping_cart',
-        verbose_name='Рецепты',
+        verbose_name='Рецепт',
     )
 
+    objects = ShoppingCartManager()
+
     class Meta:
         """Мета класс списка покупок."""
 
-        verbose_name = 'Список покупок'
+        verbose_name = 'Рецепт в списке покупок'
         verbose_name_plural = 'Списки покупок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_shopping_cart',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('recipe', 'user'), name='shopping_cart_recipe_user_idx'
+            ),
+        )
 
     def __str__(self):
         """Описание класса списка покупок."""
-        return f'{self.user}'
+        return f'{self.user} -> {self.recipe}'
+
+
+class ShoppingListItem(models.Model):
+    """Модель позиции материализованного списка покупок."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+        verbose_name='Пользователь',
+    )
+    ingredient = models.ForeignKey(
+        'recipes.Ingredient',
+        on_delete=models.CASCADE,
+        related_name='in_shopping_lists',
+        verbose_name='Ингредиент',
+    )
+    total = models.PositiveIntegerField('Всего')
+
+    objects = ShoppingListItemManager()
+
+    class Meta:
+        """Мета класс позиции списка покупок."""
+
+        verbose_name = 'Позиция списка покупок'
+        verbose_name_plural = 'Позиции списков покупок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'ingredient'),
+                name='unique_shopping_list_ingredient',
+            ),
+        )
+
+    def __str__(self):
+        """Описание позиции списка покупок."""
+        return f'{self.user}: {self.ingredient} - {self.total}'
@@ -1,17 +1,22 @@
 """Signals module."""
 
-from django.db.models.signals import post_save
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
-from .models import ShoppingCart, User
+from recipes.models import Recipe
 
+from .authentication import invalidate_token
+from .models import ShoppingCart, ShoppingListItem, User
 
-@receiver(post_save, sender=User)
-def create_shopping_cart(sender, instance, created, **kwargs):
-    """Создание списка покупок."""
-    if created:
-        ShoppingCart.objects.create(user=instance)
+# Поля пользователя, после изменения которых сбрасываются его токены.
+REVOKING_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.name in ('is_active', 'is_blocked', 'password')
+)
+# Действие m2m_changed с ингредиентами рецепта: знак изменения итогов.
+INGREDIENT_ACTIONS = {'post_add': 1, 'post_remove': -1, 'pre_clear': -1}
 
 
 @receiver(post_save, sender=User)
@@ -22,3 +27,74 @@ def destroy_token(sender, instance, created, **kwargs):
     token = Token.objects.filter(user=instance)
     if token.exists():
         token.first().delete()
+
+
+@receiver(pre_save, sender=User)
+def check_revoking_fields(sender, instance, update_fields, **kwargs):
+    """Проверка, меняются ли блокировка, активность или пароль."""
+    instance._revoke_tokens = False
+    if instance.pk is None or (
+        update_fields is not None
+        and not set(update_fields) & set(REVOKING_FIELDS)
+    ):
+        return
+    previous = User.objects.filter(pk=instance.pk).values_list(
+        *REVOKING_FIELDS
+    ).first()
+    instance._revoke_tokens = previous is not None and previous != tuple(
+        getattr(instance, name) for name in REVOKING_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Сброс закешированного пользователя после блокировки или смены пароля."""
+    if created or not getattr(instance, '_revoke_tokens', False):
+        return
+    for key in Token.objects.filter(user=instance).values_list(
+        'key', flat=True
+    ):
+        invalidate_token(key)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Сброс токена при выходе из аккаунта или блокировке."""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_shopping_list(sender, instance, created, **kwargs):
+    """Добавление ингредиентов рецепта в список покупок."""
+    if created:
+        ShoppingListItem.objects.add_recipes(
+            instance.user_id, (instance.recipe_id,)
+        )
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_from_shopping_list(sender, instance, **kwargs):
+    """Вычитание ингредиентов рецепта из списка покупок.
+
+    Выполняется до удаления, пока у рецепта, удаляемого вместе
+    с записью, ещё есть ингредиенты.
+    """
+    ShoppingListItem.objects.remove_recipes(
+        instance.user_id, (instance.recipe_id,)
+    )
+
+
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def change_shopping_lists(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    """Изменение списков покупок вместе с ингредиентами рецепта."""
+    if action not in INGREDIENT_ACTIONS:
+        return
+    sign = INGREDIENT_ACTIONS[action]
+    if not reverse:
+        counts = instance.ingredients.all() if pk_set is None else pk_set
+        ShoppingListItem.objects.change_recipe(instance.pk, counts, sign)
+        return
+    recipes = instance.recipes.all() if pk_set is None else pk_set
+    for recipe in recipes:
+        ShoppingListItem.objects.change_recipe(recipe, (instance.pk,), sign)
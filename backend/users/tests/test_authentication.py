@@ -0,0 +1,107 @@
+"""Тесты кеширования токенов."""
+
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from users.authentication import CachedTokenAuthentication, token_cache
+from users.models import User
+
+
+class TokenAuthenticationTest(TestCase):
+    """Отзыв токенов при блокировке, смене пароля и выходе."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Пользователь с токеном."""
+        cls.user = User.objects.create_user(
+            'user', 'user@mail.ru', 'password'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        """Пустой кеш токенов процесса."""
+        token_cache.entries.clear()
+        self.user.refresh_from_db()
+
+    def authenticate(self):
+        """Пользователь по токену."""
+        return CachedTokenAuthentication().authenticate_credentials(
+            self.token.key
+        )[0]
+
+    def save_user(self, **fields):
+        """Сохранение пользователя с фиксацией транзакции."""
+        for name, value in fields.items():
+            setattr(self.user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_local_cache(self):
+        """Без общего кеша блокировка видна сразу, даже в обход сигналов."""
+        self.assertEqual(self.authenticate(), self.user)
+        User.objects.filter(pk=self.user.pk).update(is_blocked=True)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+class SharedCacheTokenAuthenticationTest(TokenAuthenticationTest):
+    """Отзыв токенов через версии в общем кеше."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Общий файловый кеш во временном каталоге."""
+        cls.location = tempfile.mkdtemp()
+        cls.cache_settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': cls.location,
+        }})
+        cls.cache_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Удаление временного кеша."""
+        super().tearDownClass()
+        cls.cache_settings.disable()
+        shutil.rmtree(cls.location)
+
+    def test_local_cache(self):
+        """С общим кешем изменения в обход сигналов не видны."""
+        self.authenticate()
+        User.objects.filter(pk=self.user.pk).update(is_blocked=True)
+        with self.assertNumQueries(0):
+            self.assertFalse(self.authenticate().is_blocked)
+
+    def test_profile_change(self):
+        """Смена данных профиля не сбрасывает токены."""
+        self.authenticate()
+        self.save_user(first_name='Имя')
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+    def test_password_change(self):
+        """Смена пароля сбрасывает закешированного пользователя."""
+        self.authenticate()
+        self.user.set_password('new password')
+        self.save_user()
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+    def test_blocked(self):
+        """Заблокированный пользователь теряет доступ сразу."""
+        self.authenticate()
+        self.save_user(is_blocked=True)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_logout(self):
+        """Удалённый токен больше не действует."""
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            Token.objects.filter(user=self.user).delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
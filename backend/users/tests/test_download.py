@@ -0,0 +1,85 @@
+"""Тесты скачивания списка покупок под ASGI."""
+
+import json
+
+from asgiref.sync import async_to_sync
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from foodgram.handlers import StreamingASGIHandler
+from recipes.models import CountOfIngredient, Ingredient, Recipe
+from users.models import ShoppingCart, User
+
+
+class StreamingDownloadTest(TestCase):
+    """Потоковый ответ формируется с запросами к базе под ASGI."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Рецепт в списке покупок пользователя."""
+        cls.user = User.objects.create_user('user', 'user@mail.ru', 'password')
+        cls.token = Token.objects.create(user=cls.user)
+        recipe = Recipe.objects.create(
+            name='Рецепт', text='Текст', image='recipe.jpg', cooking_time=10,
+            author=cls.user,
+        )
+        recipe.ingredients.set([
+            CountOfIngredient.objects.create(
+                ingredient=Ingredient.objects.create(
+                    name=name, measurement_unit='г'
+                ),
+                amount=amount,
+            )
+            for name, amount in (('Мука', 200), ('Сахар', 50))
+        ])
+        ShoppingCart.objects.add_recipes(cls.user, [recipe.pk])
+
+    def setUp(self):
+        """Соединение тестовой транзакции не закрывается по сигналам."""
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+    def request(self, path, query=b''):
+        """Запрос к ASGI обработчику, отправленные им сообщения в messages."""
+        self.messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            self.messages.append(message)
+
+        async_to_sync(StreamingASGIHandler())({
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': query,
+            'headers': [
+                (b'authorization', f'Token {self.token.key}'.encode()),
+            ],
+        }, receive, send)
+
+    def test_download(self):
+        """Список покупок отдаётся по частям."""
+        self.request('/api/v1/recipes/download_shopping_cart/', b'format=txt')
+        self.assertEqual(self.messages[0]['status'], 200)
+        body = [message.get('body', b'') for message in self.messages[1:]]
+        self.assertGreater(len(body), 2)
+        self.assertEqual(
+            b''.join(body).decode(), 'Мука - 200 г\r\nСахар - 50 г\r\n'
+        )
+
+    def test_unknown_format(self):
+        """Неизвестный формат даёт 404 с телом и типом JSON."""
+        self.request('/api/v1/recipes/download_shopping_cart/', b'format=xml')
+        start, *body = self.messages
+        self.assertEqual(start['status'], 404)
+        self.assertIn(
+            (b'Content-Type', b'application/json'), start['headers']
+        )
+        self.assertIn('detail', json.loads(
+            b''.join(message.get('body', b'') for message in body)
+        ))
@@ -0,0 +1,122 @@
+"""Тесты материализованного списка покупок."""
+
+from unittest import mock
+
+from django.test import TestCase
+
+from recipes.models import CountOfIngredient, Ingredient, Recipe
+from users.models import ShoppingCart, ShoppingListItem, User
+
+
+class ShoppingListTest(TestCase):
+    """Итоги списка покупок совпадают с рецептами в списке."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Рецепты с ингредиентами и пользователи."""
+        cls.users = [
+            User.objects.create_user(
+                f'user{number}', f'user{number}@mail.ru', 'password'
+            )
+            for number in range(2)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(3)
+        ]
+        cls.counts = [
+            CountOfIngredient.objects.create(
+                ingredient=cls.ingredients[number % 3], amount=amount
+            )
+            for number, amount in enumerate((10, 20, 30, 40))
+        ]
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {number}', text='Текст', image='recipe.jpg',
+                cooking_time=10, author=cls.users[0],
+            )
+            for number in range(2)
+        ]
+        cls.recipes[0].ingredients.set(cls.counts[:2])
+        cls.recipes[1].ingredients.set(cls.counts[2:])
+
+    def totals(self, user):
+        """Итоги списка покупок пользователя по номерам ингредиентов."""
+        return {
+            self.ingredients.index(item.ingredient): item.total
+            for item in ShoppingListItem.objects.filter(user=user)
+        }
+
+    def assert_consistent(self):
+        """Итоги совпадают с пересчётом по спискам покупок."""
+        users = [user.pk for user in self.users]
+        self.assertEqual(
+            ShoppingListItem.objects.actual(users),
+            ShoppingListItem.objects.expected(users),
+        )
+
+    def test_manager(self):
+        """Добавление и удаление рецептов через API."""
+        user = self.users[0]
+        recipes = [recipe.pk for recipe in self.recipes]
+        ShoppingCart.objects.add_recipes(user, recipes)
+        self.assertEqual(self.totals(user), {0: 50, 1: 20, 2: 30})
+        ShoppingCart.objects.remove_recipes(user, recipes[1:])
+        self.assertEqual(self.totals(user), {0: 10, 1: 20})
+        self.assert_consistent()
+
+    def test_manager_without_upsert(self):
+        """Запасной путь для баз без ON CONFLICT DO UPDATE."""
+        with mock.patch(
+            'users.managers.supports_upsert', return_value=False
+        ):
+            self.test_manager()
+
+    def test_model(self):
+        """Создание и удаление записей, например в админке."""
+        user = self.users[1]
+        entries = [
+            ShoppingCart.objects.create(user=user, recipe=recipe)
+            for recipe in self.recipes
+        ]
+        self.assertEqual(self.totals(user), {0: 50, 1: 20, 2: 30})
+        entries[0].delete()
+        self.assertEqual(self.totals(user), {0: 40, 2: 30})
+        ShoppingCart.objects.filter(user=user).delete()
+        self.assertEqual(self.totals(user), {})
+
+    def test_recipe_ingredients(self):
+        """Изменение ингредиентов рецепта в списках покупок."""
+        for user in self.users:
+            ShoppingCart.objects.add_recipes(user, [self.recipes[0].pk])
+        recipe = self.recipes[0]
+        recipe.ingredients.add(self.counts[2])
+        self.assert_consistent()
+        recipe.ingredients.remove(self.counts[0])
+        self.assert_consistent()
+        recipe.ingredients.set(self.counts[1:])
+        self.assertEqual(self.totals(self.users[1]), {0: 40, 1: 20, 2: 30})
+        self.counts[3].recipes.clear()
+        self.assertEqual(self.totals(self.users[1]), {1: 20, 2: 30})
+        recipe.ingredients.clear()
+        self.assertEqual(self.totals(self.users[1]), {})
+        self.assert_consistent()
+
+    def test_delete_recipe(self):
+        """Удаление рецепта, например в админке."""
+        for user in self.users:
+            ShoppingCart.objects.add_recipes(
+                user, [recipe.pk for recipe in self.recipes]
+            )
+        self.recipes[1].delete()
+        self.assertEqual(self.totals(self.users[0]), {0: 10, 1: 20})
+        self.assert_consistent()
+
+    def test_delete_user(self):
+        """Удаление пользователя вместе со списком покупок."""
+        user = self.users[1]
+        ShoppingCart.objects.add_recipes(user, [self.recipes[0].pk])
+        user.delete()
+        self.assertFalse(ShoppingListItem.objects.exists())
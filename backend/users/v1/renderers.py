@@ -0,0 +1,154 @@
+"""Рендереры списка покупок."""
+
+import csv
+import json
+from abc import ABCMeta, abstractmethod
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen.canvas import Canvas
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Echo:
+    """Файлоподобный объект, возвращающий записанную строку."""
+
+    def write(self, value):
+        """Запись строки."""
+        return value
+
+
+class ShoppingListRenderer(BaseRenderer, metaclass=ABCMeta):
+    """Базовый рендерер списка покупок.
+
+    Содержимое файла отдаётся генератором ``stream`` построчно, а ``render``
+    используется только для ответов с ошибками, в том числе для 404 при
+    неизвестном ``?format=``, и отдаёт их как JSON.
+    """
+
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Ответ с ошибкой в формате JSON."""
+        renderer = JSONRenderer()
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = renderer.media_type
+        return renderer.render(data)
+
+    @abstractmethod
+    def stream(self, ingredients):
+        """Генерация содержимого файла по строкам (имя, единица, всего)."""
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    """Список покупок в виде текста."""
+
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, ingredients):
+        """Генерация текста."""
+        for name, measurement_unit, total in ingredients:
+            yield f'{name} - {total} {measurement_unit}\r\n'
+
+
+class CSVShoppingListRenderer(ShoppingListRenderer):
+    """Список покупок в формате CSV."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+    header = ('Ингредиент', 'Количество', 'Единица измерения')
+
+    def stream(self, ingredients):
+        """Генерация CSV."""
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.header)
+        for name, measurement_unit, total in ingredients:
+            yield writer.writerow((name, total, measurement_unit))
+
+
+class JSONShoppingListRenderer(ShoppingListRenderer):
+    """Список покупок в формате JSON."""
+
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, ingredients):
+        """Генерация JSON массива."""
+        separator = '['
+        for name, measurement_unit, total in ingredients:
+            yield separator + json.dumps(
+                {
+                    'name': name,
+                    'measurement_unit': measurement_unit,
+                    'amount': total,
+                },
+                ensure_ascii=False,
+            )
+            separator = ','
+        yield '[]' if separator == '[' else ']'
+
+
+class PDFShoppingListRenderer(ShoppingListRenderer):
+    """Список покупок в формате PDF.
+
+    Reportlab держит страницы в памяти и записывает документ только при
+    сохранении, поэтому первая часть ответа отправляется после того, как
+    собран весь документ. Записанный файл до CHUNK_SIZE хранится в памяти,
+    больший переносится на диск и отдаётся частями.
+    """
+
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    font_name = 'ShoppingListFont'
+    font_size = 12
+    margin = 50
+    line_height = 18
+
+    def register_font(self):
+        """Регистрация шрифта с поддержкой кириллицы."""
+        if self.font_name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(
+                TTFont(self.font_name, settings.SHOPPING_LIST_PDF_FONT)
+            )
+
+    def stream(self, ingredients):
+        """Сборка PDF целиком и отдача записанного файла частями."""
+        self.register_font()
+        with SpooledTemporaryFile(max_size=CHUNK_SIZE) as file:
+            canvas = Canvas(file, pagesize=A4)
+            canvas.setTitle('Список покупок')
+            _, height = A4
+            top = height - self.margin
+            y = top
+            canvas.setFont(self.font_name, self.font_size)
+            for name, measurement_unit, total in ingredients:
+                if y < self.margin:
+                    canvas.showPage()
+                    canvas.setFont(self.font_name, self.font_size)
+                    y = top
+                canvas.drawString(
+                    self.margin, y, f'• {name} - {total} {measurement_unit}'
+                )
+                y -= self.line_height
+            canvas.save()
+            file.seek(0)
+            chunk = file.read(CHUNK_SIZE)
+            while chunk:
+                yield chunk
+                chunk = file.read(CHUNK_SIZE)
+
+
+SHOPPING_LIST_RENDERERS = (
+    TextShoppingListRenderer,
+    CSVShoppingListRenderer,
+    JSONShoppingListRenderer,
+    PDFShoppingListRenderer,
+)
@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from rest_framework import serializers
 
 from api.serializers.nested import RecipeShortReadSerializer
+from api.serializers.viewer import get_viewer
 from users.models import Subscribe, User
 
 
@@ -38,11 +39,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     def is_subscribed_user(self, obj):
         """Проверка подписки пользователя."""
-        user = self.context['request'].user
-        return (
-            user.is_authenticated
-            and obj.subscribing.filter(user=user).exists()
-        )
+        return get_viewer(self.context, authors=(obj,)).is_subscribed(obj)
 
     def create(self, validated_data):
         """Создание пользователя."""
@@ -56,7 +53,7 @@ class SubscriptionSerializer(UserSerializer):
     """Сериализатор для подписок."""
 
     recipes = RecipeShortReadSerializer(many=True)
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta(UserSerializer.Meta):
         """Мета класс сериализатора для подписок."""
@@ -74,7 +71,3 @@ class SubscriptionSerializer(UserSerializer):
         if Subscribe.objects.filter(author=author, user=user).exists():
             raise serializers.ValidationError('Нельзя подписаться дважды!')
         return data
-
-    def get_recipes_count(self, obj):
-        """Получение количества рецептов."""
-        return obj.recipes.count()
@@ -1,8 +1,8 @@
 """Классы представления приложения users."""
 
 from django.db import IntegrityError
-from django.db.models import Sum
-from django.http import Http404, HttpResponse
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from djoser.views import TokenCreateView, UserViewSet
 from rest_framework import status
@@ -12,10 +12,12 @@ from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from api.serializers.nested import RecipeShortReadSerializer
+from api.v1.mixins import RecipeBatchMixin, ViewerContextMixin
 from foodgram.pagination import LimitPageNumberPagination
 from recipes.models import Recipe
-from users.models import ShoppingCart, Subscribe, User
+from users.models import ShoppingCart, ShoppingListItem, Subscribe, User
 
+from .renderers import SHOPPING_LIST_RENDERERS
 from .serializers import SubscriptionSerializer
 
 
@@ -32,27 +34,59 @@ class TokenCreateWithCheckBlockStatusView(TokenCreateView):
         return super()._action(serializer)
 
 
-class UserSubscribeViewSet(UserViewSet):
+class UserSubscribeViewSet(ViewerContextMixin, UserViewSet):
     """Подписка пользователя."""
 
     pagination_class = LimitPageNumberPagination
+    viewer_objects = 'authors'
     lookup_url_kwarg = 'user_id'
 
-    def get_subscription_serializer(self, *args, **kwargs):
+    def get_subscription_serializer(self, authors, many=False):
         """Получение подписки."""
-        kwargs.setdefault('context', self.get_serializer_context())
-        return SubscriptionSerializer(*args, **kwargs)
+        return SubscriptionSerializer(
+            authors,
+            many=many,
+            context=self.get_viewer_context(authors if many else (authors,)),
+        )
+
+    def get_recipes_limit(self):
+        """Количество рецептов автора из параметра recipes_limit."""
+        try:
+            limit = int(self.request.query_params['recipes_limit'])
+        except (KeyError, ValueError):
+            return None
+        return limit if limit >= 0 else None
+
+    def get_subscriptions_queryset(self):
+        """Авторы, на которых подписан пользователь."""
+        return User.objects.filter(
+            subscribing__user=self.request.user
+        ).order_by('-pk')
+
+    def prefetch_recipes(self, authors):
+        """Подгрузка последних рецептов всех авторов одним запросом."""
+        prefetch_related_objects(authors, Prefetch(
+            'recipes',
+            queryset=Recipe.objects.only(
+                'id', 'name', 'image', 'image_variants', 'cooking_time',
+                'author',
+            ).latest_by_authors(authors, self.get_recipes_limit()),
+        ))
+        return authors
 
     @action(detail=False, permission_classes=(IsAuthenticated,))
     def subscriptions(self, request):
         """Подписки."""
-        self.get_serializer
-        queryset = User.objects.filter(subscribing__user=request.user)
+        queryset = self.get_subscriptions_queryset()
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_subscription_serializer(page, many=True)
+            serializer = self.get_subscription_serializer(
+                self.prefetch_recipes(page), many=True
+            )
             return self.get_paginated_response(serializer.data)
-        serializer = self.get_subscription_serializer(queryset, many=True)
+        serializer = self.get_subscription_serializer(
+            self.prefetch_recipes(list(queryset)), many=True
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def create_subscribe(self, request, author):
@@ -67,7 +101,10 @@ class UserSubscribeViewSet(UserViewSet):
                 {'errors': 'Нельзя подписаться на данного пользователя!'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        serializer = self.get_subscription_serializer(subscribe.author)
+        author = self.get_subscriptions_queryset().get(pk=subscribe.author_id)
+        serializer = self.get_subscription_serializer(
+            self.prefetch_recipes([author])[0]
+        )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete_subscribe(self, request, author):
@@ -103,90 +140,82 @@ class UserSubscribeViewSet(UserViewSet):
         return self.delete_subscribe(request, author)
 
 
-class ShoppingCartViewSet(GenericViewSet):
+class ShoppingCartViewSet(RecipeBatchMixin, GenericViewSet):
     """Список покупок."""
 
-    NAME = 'ingredients__ingredient__name'
-    MEASUREMENT_UNIT = 'ingredients__ingredient__measurement_unit'
     permission_classes = (IsAuthenticated,)
     serializer_class = RecipeShortReadSerializer
     queryset = ShoppingCart.objects.all()
     http_method_names = ('get', 'post', 'delete')
+    lookup_value_regex = r'\d+'
 
     def generate_shopping_cart_data(self, request):
         """Генерация данных для списка покупок."""
-        recipes = (
-            request.user.shopping_cart.recipes.prefetch_related('ingredients')
-        )
         return (
-            recipes.order_by(self.NAME)
-            .values(
-                self.NAME,
-                self.MEASUREMENT_UNIT
+            ShoppingListItem.objects.filter(user=request.user)
+            .order_by('ingredient__name')
+            .values_list(
+                'ingredient__name', 'ingredient__measurement_unit', 'total'
             )
-            .annotate(total=Sum('ingredients__amount'))
         )
 
-    def generate_ingredients_content(self, ingredients):
-        """Генерация ингредиентов."""
-        content = ''
-        for ingredient in ingredients:
-            content += (
-                f'{ingredient[self.NAME]}'
-                f' - {ingredient["total"]} '
-                f'{ingredient[self.MEASUREMENT_UNIT]}\r\n'
-            )
-        return content
-
-    @action(detail=False)
+    @action(detail=False, renderer_classes=SHOPPING_LIST_RENDERERS)
     def download_shopping_cart(self, request):
-        """Скачивание списка покупок."""
-        try:
-            ingredients = self.generate_shopping_cart_data(request)
-        except ShoppingCart.DoesNotExist:
-            return Response(
-                {'errors': 'Список покупок не существует!'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        content = self.generate_ingredients_content(ingredients)
-        response = HttpResponse(
-            content, content_type='text/plain, charset=utf8'
+        """Скачивание списка покупок в формате txt, csv, json или pdf."""
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f'; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            renderer.stream(
+                self.generate_shopping_cart_data(request).iterator()
+            ),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename=shopping_list.{renderer.format}'
         )
-        response['Content-Disposition'] = 'attachment; filename=shopping_list'
         return response
 
-    def add_to_shopping_cart(self, request, recipe, shopping_cart):
-        """Добавление в список покупок."""
-        if shopping_cart.recipes.filter(pk__in=(recipe.pk,)).exists():
+    def add_to_shopping_cart(self, request, pk):
+        """Добавление в список покупок.
+
+        Рецепт загружается один раз после вставки, как в избранном.
+        """
+        added = ShoppingCart.objects.add_recipes(request.user, (pk,))
+        recipe = get_object_or_404(Recipe, pk=pk)
+        if not added:
             return Response(
                 {'errors': 'Рецепт уже добавлен!'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        shopping_cart.recipes.add(recipe)
         serializer = self.get_serializer(recipe)
         return Response(
             serializer.data,
             status=status.HTTP_201_CREATED
         )
 
-    def remove_from_shopping_cart(self, request, recipe, shopping_cart):
+    def remove_from_shopping_cart(self, request, pk):
         """Удаление из списка покупок."""
-        if not shopping_cart.recipes.filter(pk__in=(recipe.pk,)).exists():
+        if not ShoppingCart.objects.remove_recipes(request.user, (pk,)):
+            get_object_or_404(Recipe, pk=pk)
             return Response(
                 {'errors': 'Нельзя удалить рецепт из списка покупок, '
                            'которого нет в списке покупок!'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        shopping_cart.recipes.remove(recipe)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(methods=('post', 'delete'), detail=True)
     def shopping_cart(self, request, pk=None):
         """Список покупок."""
-        recipe = get_object_or_404(Recipe, pk=pk)
-        shopping_cart = (
-            ShoppingCart.objects.get_or_create(user=request.user)[0]
-        )
         if request.method == 'POST':
-            return self.add_to_shopping_cart(request, recipe, shopping_cart)
-        return self.remove_from_shopping_cart(request, recipe, shopping_cart)
+            return self.add_to_shopping_cart(request, int(pk))
+        return self.remove_from_shopping_cart(request, int(pk))
+
+    @action(
+        methods=('post', 'delete'), detail=False, url_path='shopping_cart'
+    )
+    def shopping_cart_batch(self, request):
+        """Добавление или удаление нескольких рецептов, например плана."""
+        return self.batch_response(request, ShoppingCart.objects)